@@ -1,14 +1,29 @@
-from flask import Blueprint, render_template, redirect, url_for, jsonify, request
+from flask import (
+    Blueprint,
+    render_template,
+    redirect,
+    url_for,
+    jsonify,
+    request,
+    current_app,
+    send_from_directory,
+)
 from flask_login import login_required, current_user
 from functools import wraps
 from models import db, User, Generation, GeneratedImage, Feedback
-from sqlalchemy import func, desc
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta
-from utils.storage import GCSStorage
+from routes import get_storage, release_image, delete_stored_images
+from utils.cache import RefreshingCache
+from utils.pagination import keyset_page, parse_limit
+from utils.profiling import list_profiles, profile_dir
+from utils.user_cache import user_cache
+from utils.search import matches
+import io
+import pstats
 import logging
 
-storage = GCSStorage()
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -18,6 +33,9 @@ logger = logging.getLogger(__name__)
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
+# Shared cache for aggregate analytics queries (per process)
+analytics_cache = RefreshingCache()
+
 
 def admin_required(f):
     @wraps(f)
@@ -30,6 +48,88 @@ def admin_required(f):
     return decorated_function
 
 
+def cached_analytics(key, compute):
+    """
+    Serve an analytics payload from the shared cache as a JSON response.
+
+    The computation runs inside its own app context so it can be refreshed
+    from a background thread after the request has finished.
+    """
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            return compute()
+
+    value, computed_at = analytics_cache.get(
+        key,
+        run,
+        ttl=app.config["ADMIN_ANALYTICS_CACHE_TTL"],
+        stale_ttl=app.config["ADMIN_ANALYTICS_STALE_TTL"],
+    )
+
+    response = jsonify(value)
+    response.headers["X-Computed-At"] = computed_at.isoformat() + "Z"
+    return response
+
+
+def image_count_column():
+    """Correlated per-generation image count, evaluated only for the rows returned."""
+    return (
+        db.session.query(func.count(GeneratedImage.id))
+        .filter(GeneratedImage.generation_id == Generation.generation_id)
+        .correlate(Generation)
+        .scalar_subquery()
+        .label("image_count")
+    )
+
+
+def serialize_user(user):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "is_admin": user.is_admin,
+        "created_at": user.created_at.isoformat(),
+        "generation_count": user.generation_count,
+        "image_count": user.image_count,
+        "last_generated_at": (
+            user.last_generated_at.isoformat() if user.last_generated_at else None
+        ),
+    }
+
+
+def paginated_users(default_limit):
+    """Keyset-paginated users with optional search and role filters."""
+    query = User.query
+
+    search = request.args.get("q", "").strip()
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(or_(User.username.ilike(pattern), User.email.ilike(pattern)))
+
+    role = request.args.get("role")
+    if role == "admin":
+        query = query.filter(User.is_admin.is_(True))
+    elif role == "user":
+        query = query.filter(User.is_admin.is_(False))
+
+    rows, next_cursor = keyset_page(
+        query,
+        User.created_at,
+        User.id,
+        cursor=request.args.get("cursor"),
+        limit=parse_limit(request.args.get("limit"), default=default_limit),
+    )
+
+    return jsonify(
+        {
+            "users": [serialize_user(user) for user in rows],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
 @admin_bp.route("/")
 @admin_required
 def dashboard():
@@ -39,6 +139,10 @@ def dashboard():
 @admin_bp.route("/api/stats")
 @admin_required
 def get_stats():
+    return cached_analytics("stats", compute_stats)
+
+
+def compute_stats():
     total_users = User.query.count()
     total_generations = Generation.query.count()
     total_images = GeneratedImage.query.count()
@@ -65,75 +169,85 @@ def get_stats():
         Generation.created_at >= month_ago
     ).count()
 
-    return jsonify(
-        {
-            "total_users": total_users,
-            "total_generations": total_generations,
-            "total_images": total_images,
-            "users_today": users_today,
-            "users_this_week": users_this_week,
-            "users_this_month": users_this_month,
-            "generations_today": generations_today,
-            "generations_this_week": generations_this_week,
-            "generations_this_month": generations_this_month,
-        }
-    )
+    return {
+        "total_users": total_users,
+        "total_generations": total_generations,
+        "total_images": total_images,
+        "users_today": users_today,
+        "users_this_week": users_this_week,
+        "users_this_month": users_this_month,
+        "generations_today": generations_today,
+        "generations_this_week": generations_this_week,
+        "generations_this_month": generations_this_month,
+    }
 
 
 @admin_bp.route("/api/recent-users")
 @admin_required
 def get_recent_users():
-    users = User.query.order_by(desc(User.created_at)).limit(10).all()
-
-    return jsonify(
-        [
-            {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "created_at": user.created_at.isoformat(),
-                "generation_count": len(user.generations),
-            }
-            for user in users
-        ]
-    )
+    return paginated_users(default_limit=10)
 
 
 @admin_bp.route("/api/recent-generations")
 @admin_required
 def get_recent_generations():
-    generations = Generation.query.order_by(desc(Generation.created_at)).limit(10).all()
+    query = db.session.query(Generation, User.username, image_count_column()).join(
+        User, Generation.user_id == User.id
+    )
+
+    style_filter = request.args.get("style")
+    if style_filter and style_filter != "all":
+        query = query.filter(Generation.style == style_filter)
+
+    rows, next_cursor = keyset_page(
+        query,
+        Generation.created_at,
+        Generation.id,
+        cursor=request.args.get("cursor"),
+        limit=parse_limit(request.args.get("limit"), default=10),
+    )
 
     return jsonify(
-        [
-            {
-                "id": gen.id,
-                "username": gen.user.username,
-                "title": gen.title,
-                "style": gen.style,
-                "created_at": gen.created_at.isoformat(),
-                "image_count": len(gen.images),
-            }
-            for gen in generations
-        ]
+        {
+            "generations": [
+                {
+                    "id": gen.id,
+                    "username": username,
+                    "title": gen.title,
+                    "style": gen.style,
+                    "created_at": gen.created_at.isoformat(),
+                    "image_count": image_count,
+                }
+                for gen, username, image_count in rows
+            ],
+            "next_cursor": next_cursor,
+        }
     )
 
 
 @admin_bp.route("/api/style-distribution")
 @admin_required
 def get_style_distribution():
+    return cached_analytics("style-distribution", compute_style_distribution)
+
+
+def compute_style_distribution():
     styles = (
         db.session.query(Generation.style, func.count(Generation.id).label("count"))
         .group_by(Generation.style)
         .all()
     )
 
-    return jsonify([{"style": style, "count": count} for style, count in styles])
+    return [{"style": style, "count": count} for style, count in styles]
 
 
 @admin_bp.route("/api/user-activity")
 @admin_required
 def get_user_activity():
+    return cached_analytics("user-activity", compute_user_activity)
+
+
+def compute_user_activity():
     days = 30
     data = []
 
@@ -154,52 +268,43 @@ def get_user_activity():
             }
         )
 
-    return jsonify(data)
+    return data
 
 
 @admin_bp.route("/api/top-users")
 @admin_required
 def get_top_users():
+    return cached_analytics("top-users", compute_top_users)
+
+
+def compute_top_users():
+    # Served by idx_users_generation_count instead of grouping all generations
     users = (
-        db.session.query(User, func.count(Generation.id).label("generation_count"))
-        .join(Generation)
-        .group_by(User.id)
-        .order_by(desc("generation_count"))
+        User.query.filter(User.generation_count > 0)
+        .order_by(User.generation_count.desc(), User.id)
         .limit(10)
         .all()
     )
 
-    return jsonify(
-        [
-            {
-                "username": user.username,
-                "email": user.email,
-                "generation_count": count,
-                "created_at": user.created_at.isoformat(),
-            }
-            for user, count in users
-        ]
-    )
+    return [
+        {
+            "username": user.username,
+            "email": user.email,
+            "generation_count": user.generation_count,
+            "image_count": user.image_count,
+            "last_generated_at": (
+                user.last_generated_at.isoformat() if user.last_generated_at else None
+            ),
+            "created_at": user.created_at.isoformat(),
+        }
+        for user in users
+    ]
 
 
 @admin_bp.route("/api/users")
 @admin_required
 def get_all_users():
-    users = User.query.order_by(desc(User.created_at)).all()
-
-    return jsonify(
-        [
-            {
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "is_admin": user.is_admin,
-                "created_at": user.created_at.isoformat(),
-                "generation_count": len(user.generations),
-            }
-            for user in users
-        ]
-    )
+    return paginated_users(default_limit=50)
 
 
 @admin_bp.route("/api/users/<int:user_id>/promote", methods=["POST"])
@@ -208,6 +313,7 @@ def promote_user(user_id):
     user = User.query.get_or_404(user_id)
     user.is_admin = True
     db.session.commit()
+    user_cache.invalidate(user.id)
 
     return jsonify({"success": True, "message": f"{user.username} is now an admin"})
 
@@ -222,6 +328,7 @@ def demote_user(user_id):
 
     user.is_admin = False
     db.session.commit()
+    user_cache.invalidate(user.id)
 
     return jsonify(
         {"success": True, "message": f"{user.username} is no longer an admin"}
@@ -238,14 +345,28 @@ def delete_user(user_id):
 
     username = user.username
 
-    try:
-        storage.delete_user_folder(username)
-    except Exception as e:
-        logger.warning(f"Error deleting user folder from GCS: {e}")
+    images = (
+        GeneratedImage.query.join(Generation)
+        .filter(Generation.user_id == user.id)
+        .all()
+    )
+    stale_paths = [
+        release_image(path) for image in images for path in image.storage_paths()
+    ]
 
     db.session.delete(user)
     db.session.commit()
 
+    # Content-addressed images may be shared, so only unreferenced ones go;
+    # the folder holds images saved before content addressing
+    delete_stored_images([path for path in stale_paths if path])
+    try:
+        get_storage().delete_user_folder(username)
+    except Exception as e:
+        logger.warning(f"Error deleting user folder from GCS: {e}")
+    user_cache.invalidate(user_id)
+    analytics_cache.invalidate()
+
     return jsonify({"success": True, "message": f"User {username} has been deleted"})
 
 
@@ -253,30 +374,47 @@ def delete_user(user_id):
 @admin_required
 def get_feedback():
     status_filter = request.args.get("status")
+    type_filter = request.args.get("type")
 
-    query = Feedback.query
+    query = Feedback.query.options(joinedload(Feedback.user))
 
     if status_filter and status_filter != "all":
         query = query.filter_by(status=status_filter)
 
-    feedback_list = query.order_by(desc(Feedback.created_at)).all()
+    if type_filter and type_filter != "all":
+        query = query.filter_by(feedback_type=type_filter)
+
+    search = request.args.get("q", "").strip()
+    if search:
+        query = query.filter(matches(Feedback, Feedback.message, search))
+
+    feedback_list, next_cursor = keyset_page(
+        query,
+        Feedback.created_at,
+        Feedback.id,
+        cursor=request.args.get("cursor"),
+        limit=parse_limit(request.args.get("limit")),
+    )
 
     return jsonify(
-        [
-            {
-                "id": fb.id,
-                "type": fb.feedback_type,
-                "rating": fb.rating,
-                "message": fb.message,
-                "status": fb.status,
-                "created_at": fb.created_at.isoformat(),
-                "user": {
-                    "username": fb.user.username if fb.user else fb.name or "Anonymous",
-                    "email": fb.user.email if fb.user else fb.email,
-                },
-            }
-            for fb in feedback_list
-        ]
+        {
+            "feedback": [
+                {
+                    "id": fb.id,
+                    "type": fb.feedback_type,
+                    "rating": fb.rating,
+                    "message": fb.message,
+                    "status": fb.status,
+                    "created_at": fb.created_at.isoformat(),
+                    "user": {
+                        "username": fb.user.username if fb.user else fb.name or "Anonymous",
+                        "email": fb.user.email if fb.user else fb.email,
+                    },
+                }
+                for fb in feedback_list
+            ],
+            "next_cursor": next_cursor,
+        }
     )
 
 
@@ -305,3 +443,27 @@ def delete_feedback(feedback_id):
     db.session.commit()
 
     return jsonify({"success": True, "message": "Feedback deleted successfully"})
+
+
+@admin_bp.route("/api/profiles")
+@admin_required
+def get_profiles():
+    return jsonify(list_profiles(current_app))
+
+
+@admin_bp.route("/api/profiles/<name>")
+@admin_required
+def download_profile(name):
+    """Download a stored cProfile dump, or ?format=text for a cumulative-time summary."""
+    directory = profile_dir(current_app)
+
+    if request.args.get("format") == "text":
+        if name not in {p["name"] for p in list_profiles(current_app)}:
+            return jsonify({"error": "Profile not found"}), 404
+
+        output = io.StringIO()
+        stats = pstats.Stats(f"{directory}/{name}", stream=output)
+        stats.sort_stats("cumulative").print_stats(50)
+        return current_app.response_class(output.getvalue(), mimetype="text/plain")
+
+    return send_from_directory(directory, name, as_attachment=True)
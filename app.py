@@ -1,13 +1,26 @@
 import os
 import base64
 import logging
-from flask import Flask
+import click
+from flask import Flask, request
 from flask_login import LoginManager
 
 from config import Config
-from models import db, User
+from models import db, User, backfill_usage_counters
 from routes import main_bp
 from admin import admin_bp
+from bulk import bulk_bp
+from utils.metrics import init_metrics, IMAGE_BUDGET_REJECTIONS
+from utils.profiling import init_profiling
+from utils.query_stats import init_query_stats
+from utils.user_cache import CachedUser, user_cache
+from utils.process_pool import ImagePoolBusy
+from utils.image_processor import ImageTooLarge
+from utils.search import init_search
+from utils.schema import init_schema, upgrade_schema
+from utils.assets import init_assets
+from utils.json_provider import init_json
+from utils.compression import init_compression
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -19,6 +32,7 @@ def create_app():
     """Application factory."""
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_json(app)
 
     db.init_app(app)
 
@@ -26,12 +40,35 @@ def create_app():
     login_manager.init_app(app)
     login_manager.login_view = "main.login"
 
+    def load_identity(user_id):
+        row = (
+            db.session.query(User.id, User.username, User.is_admin)
+            .filter(User.id == user_id)
+            .first()
+        )
+        return CachedUser(*row) if row else None
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return user_cache.get(int(user_id), load_identity)
 
     app.register_blueprint(main_bp)
     app.register_blueprint(admin_bp)
+    app.register_blueprint(bulk_bp)
+
+    init_metrics(app)
+    init_query_stats(app)
+    init_profiling(app)
+    init_search(app)
+    init_schema(app)
+    init_assets(app)
+    init_compression(app)
+
+    @app.cli.command("backfill-user-counters")
+    def backfill_user_counters():
+        """Add the usage counter columns if missing, then recompute every user's counters."""
+        upgrade_schema()
+        click.echo(f"Updated usage counters for {backfill_usage_counters()} users")
 
     @app.template_filter("b64encode")
     def b64encode_filter(data):
@@ -42,6 +79,17 @@ def create_app():
         logger.warning(f"404 error: {error}")
         return {"error": "Resource not found"}, 404
 
+    @app.errorhandler(ImagePoolBusy)
+    def image_pool_busy(error):
+        logger.warning(f"Shedding {request.path}: {error}")
+        return {"error": str(error)}, 503, {"Retry-After": "5"}
+
+    @app.errorhandler(ImageTooLarge)
+    def image_too_large(error):
+        IMAGE_BUDGET_REJECTIONS.labels(reason=error.reason).inc()
+        logger.warning(f"Refusing {request.path}: {error}")
+        return {"error": str(error)}, 413
+
     @app.errorhandler(500)
     def internal_error(error):
         logger.error(f"500 error: {error}")
@@ -51,11 +99,24 @@ def create_app():
     return app
 
 
-app = create_app()
+_app = None
+
+
+def __getattr__(name):
+    """Build the module-level app on first access (e.g. gunicorn's app:app), not at import."""
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
+    app = create_app()
+
     with app.app_context():
-        db.create_all()
+        upgrade_schema()
 
     port = int(os.getenv("PORT", 5001))
     app.run(debug=True, port=port, host="0.0.0.0")
\ No newline at end of file
@@ -0,0 +1,443 @@
+from flask import (
+    Blueprint,
+    jsonify,
+    request,
+    url_for,
+    send_file,
+    current_app,
+)
+from flask_login import login_required, current_user
+from datetime import datetime, timedelta
+from sqlalchemy import func
+import io
+import csv
+import uuid
+import asyncio
+import logging
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+from models import db, BulkJob, BulkJobItem, Generation, GeneratedImage
+from routes import STYLES, get_storage, store_image, discard_uploads, schedule_variants
+from utils.background import run_in_background
+from utils.image_generator import NanoBananaClient
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+bulk_bp = Blueprint("bulk", __name__, url_prefix="/api/bulk")
+
+# Jobs queued or running in this worker process, by job ID, with their owner
+_active_jobs = {}
+_active_lock = threading.Lock()
+
+# Batches get their own threads so they never hold up variant rendering on
+# the shared background pool
+_executor = None
+
+
+def parse_posts():
+    """
+    Read the posts to generate from the request.
+
+    Accepts a JSON list (or {"posts": [...]}) of objects with title, style and
+    optional draft_link, or CSV with those column headers, either as the raw
+    body or as an uploaded "file".
+
+    Returns:
+        list: Dicts with title, style and draft_link
+
+    Raises:
+        ValueError: If the input is malformed, empty or too large
+    """
+    upload = request.files.get("file")
+    if upload is not None or request.mimetype == "text/csv":
+        raw = upload.read() if upload is not None else request.get_data()
+        rows = list(csv.DictReader(io.StringIO(raw.decode("utf-8-sig"))))
+    else:
+        data = request.get_json(silent=True)
+        rows = data.get("posts") if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            raise ValueError("Send a JSON list of posts or a CSV file")
+
+    posts = []
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            raise ValueError(f"Row {number}: expected an object with a title")
+
+        title = (row.get("title") or "").strip()
+        style = (row.get("style") or "Professional").strip()
+        draft_link = (row.get("draft_link") or "").strip() or None
+
+        if not title:
+            raise ValueError(f"Row {number}: title is required")
+        if style not in STYLES:
+            raise ValueError(f"Row {number}: unknown style {style!r}")
+
+        posts.append({"title": title[:500], "style": style, "draft_link": draft_link})
+
+    if not posts:
+        raise ValueError("No posts to generate")
+    if len(posts) > Config.BULK_MAX_ITEMS:
+        raise ValueError(f"At most {Config.BULK_MAX_ITEMS} posts per batch")
+
+    return posts
+
+
+def job_progress(job):
+    counts = dict(
+        db.session.query(BulkJobItem.status, func.count(BulkJobItem.id))
+        .filter(BulkJobItem.job_id == job.id)
+        .group_by(BulkJobItem.status)
+        .all()
+    )
+    finished = job.status in ("completed", "failed")
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "total": sum(counts.values()),
+        "done": counts.get("done", 0),
+        "failed": counts.get("failed", 0),
+        "pending": counts.get("pending", 0),
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+        "download_url": url_for("bulk.download_job", job_id=job.id) if finished else None,
+        "resume_url": url_for("bulk.resume_job", job_id=job.id) if job.status == "failed" else None,
+    }
+
+
+def get_user_job(job_id):
+    return BulkJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+
+
+def get_executor():
+    """Lazy initialization of the bulk job thread pool."""
+    global _executor
+    if _executor is None:
+        with _active_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.BULK_WORKERS,
+                    thread_name_prefix="cover-bulk",
+                )
+    return _executor
+
+
+def _at_user_limit(user_id):
+    """Whether user_id has BULK_MAX_JOBS_PER_USER jobs here; call with _active_lock held."""
+    active = sum(1 for owner in _active_jobs.values() if owner == user_id)
+    return active >= Config.BULK_MAX_JOBS_PER_USER
+
+
+def at_user_limit(user_id):
+    with _active_lock:
+        return _at_user_limit(user_id)
+
+
+def start_job(job):
+    """
+    Queue job on the bulk pool unless capped.
+
+    Returns:
+        str: "started", "running" (this process already has the job) or
+            "busy" (the owner is at BULK_MAX_JOBS_PER_USER)
+    """
+    with _active_lock:
+        if job.id in _active_jobs:
+            return "running"
+        if _at_user_limit(job.user_id):
+            return "busy"
+        _active_jobs[job.id] = job.user_id
+
+    run_in_background(
+        current_app._get_current_object(), run_job, job.id, executor=get_executor()
+    )
+    return "started"
+
+
+def run_job(job_id):
+    """
+    Generate every unfinished item of a job, saving each as it completes.
+
+    Progress is committed per item, so if the process dies the job can be
+    resumed and only the items without a saved generation run again.
+    """
+    try:
+        job = db.session.get(BulkJob, job_id)
+        if job is None:
+            return
+
+        job.status = "running"
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        items = [
+            (item.id, item.title, item.style, item.draft_link)
+            for item in BulkJobItem.query.filter(
+                BulkJobItem.job_id == job_id, BulkJobItem.status != "done"
+            ).order_by(BulkJobItem.position)
+        ]
+
+        logger.info(f"Bulk job {job_id}: generating {len(items)} covers")
+        asyncio.run(generate_items(job_id, items))
+
+        failed = BulkJobItem.query.filter_by(job_id=job_id, status="failed").count()
+        job = db.session.get(BulkJob, job_id)
+        job.status = "failed" if failed else "completed"
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+
+        logger.info(f"Bulk job {job_id} {job.status} ({failed} failed)")
+    except Exception:
+        db.session.rollback()
+        job = db.session.get(BulkJob, job_id)
+        if job is not None:
+            job.status = "failed"
+            db.session.commit()
+        raise
+    finally:
+        with _active_lock:
+            _active_jobs.pop(job_id, None)
+
+
+async def generate_items(job_id, items):
+    """
+    Run model calls for items with at most BULK_CONCURRENCY in flight.
+
+    Each job runs on its own event loop (asyncio.run in run_job), so it gets
+    its own client too: the SDK's async connections stay bound to the loop
+    that opened them and fail on any other. Model errors are not replaced by
+    placeholder images; the item is marked failed so resume can retry it.
+    """
+    client = NanoBananaClient()
+    limit = asyncio.Semaphore(Config.BULK_CONCURRENCY)
+
+    async def generate_one(item_id, title, style, draft_link):
+        async with limit:
+            try:
+                images = await client.generate_images_async(
+                    title, style, draft_link, count=1, fallback=False
+                )
+            except Exception as e:
+                return item_id, None, str(e)
+        if not images:
+            return item_id, None, "The model returned no image"
+        return item_id, images[0], None
+
+    try:
+        tasks = [asyncio.create_task(generate_one(*item)) for item in items]
+        for next_result in asyncio.as_completed(tasks):
+            save_item(job_id, *(await next_result))
+    finally:
+        await client.aclose()
+
+
+def save_item(job_id, item_id, image_bytes, error):
+    """Record one item's outcome, saving its cover as a Generation on success."""
+    item = db.session.get(BulkJobItem, item_id)
+    job = db.session.get(BulkJob, job_id)
+    uploads = []
+
+    try:
+        if image_bytes is None:
+            item.status = "failed"
+            item.error = (error or "Unknown error")[:500]
+        else:
+            generation_id = str(uuid.uuid4())
+            db.session.add(
+                Generation(
+                    user_id=job.user_id,
+                    title=item.title,
+                    style=item.style,
+                    draft_link=item.draft_link,
+                    generation_id=generation_id,
+                )
+            )
+            image = GeneratedImage(
+                generation_id=generation_id,
+                image_url=store_image(image_bytes, uploads=uploads),
+                index_number=0,
+            )
+            db.session.add(image)
+            item.status = "done"
+            item.error = None
+            item.generation_id = generation_id
+
+        job.updated_at = datetime.utcnow()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        discard_uploads(uploads)
+        logger.error(f"Bulk job {job_id}: failed to save item {item_id}: {e}")
+        item = db.session.get(BulkJobItem, item_id)
+        item.status = "failed"
+        item.error = str(e)[:500]
+        db.session.commit()
+        return
+
+    if image_bytes is not None:
+        schedule_variants(image, image_bytes)
+
+
+@bulk_bp.route("", methods=["POST"])
+@login_required
+def create_job():
+    """Create a bulk generation job from a JSON list or CSV of posts."""
+    try:
+        posts = parse_posts()
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({"error": str(e)}), 400
+
+    if at_user_limit(current_user.id):
+        return jsonify({"error": "Another bulk job is still running, try again when it finishes"}), 429
+
+    job = BulkJob(id=str(uuid.uuid4()), user_id=current_user.id)
+    db.session.add(job)
+    db.session.add_all(
+        BulkJobItem(job_id=job.id, position=position, **post)
+        for position, post in enumerate(posts)
+    )
+    db.session.commit()
+
+    if start_job(job) == "busy":
+        # Lost a race with another request; the job stays pending for resume
+        return (
+            jsonify(
+                {
+                    "error": "Another bulk job is still running, resume this one when it finishes",
+                    "job_id": job.id,
+                    "resume_url": url_for("bulk.resume_job", job_id=job.id),
+                }
+            ),
+            429,
+        )
+
+    return (
+        jsonify(
+            {
+                "job_id": job.id,
+                "total": len(posts),
+                "status_url": url_for("bulk.get_job", job_id=job.id),
+            }
+        ),
+        202,
+    )
+
+
+@bulk_bp.route("/<job_id>", methods=["GET"])
+@login_required
+def get_job(job_id):
+    """Report a job's progress, with per-item results when ?items=1."""
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    progress = job_progress(job)
+
+    if request.args.get("items"):
+        progress["items"] = [
+            {
+                "position": item.position,
+                "title": item.title,
+                "style": item.style,
+                "status": item.status,
+                "generation_id": item.generation_id,
+                "error": item.error,
+            }
+            for item in job.items
+        ]
+
+    return jsonify(progress)
+
+
+@bulk_bp.route("/<job_id>/resume", methods=["POST"])
+@login_required
+def resume_job(job_id):
+    """Retry a job's failed and unfinished items."""
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job.status == "completed":
+        return jsonify({"error": "Job already completed"}), 409
+
+    stale = datetime.utcnow() - timedelta(seconds=Config.BULK_STALE_SECONDS)
+    if job.status == "running" and job.updated_at > stale:
+        return jsonify({"error": "Job is still running"}), 409
+
+    BulkJobItem.query.filter_by(job_id=job.id, status="failed").update(
+        {"status": "pending", "error": None}
+    )
+    job.status = "pending"
+    job.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    started = start_job(job)
+    if started == "running":
+        return jsonify({"error": "Job is still running"}), 409
+    if started == "busy":
+        return jsonify({"error": "Another bulk job is still running, try again when it finishes"}), 429
+
+    return jsonify(job_progress(job)), 202
+
+
+@bulk_bp.route("/<job_id>/download", methods=["GET"])
+@login_required
+def download_job(job_id):
+    """Download a finished job's covers as a ZIP, with a manifest.csv of results."""
+    job = get_user_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    if job.status not in ("completed", "failed"):
+        return jsonify({"error": "Job has not finished yet"}), 409
+
+    images = dict(
+        db.session.query(GeneratedImage.generation_id, GeneratedImage.image_url)
+        .join(BulkJobItem, BulkJobItem.generation_id == GeneratedImage.generation_id)
+        .filter(BulkJobItem.job_id == job.id)
+        .all()
+    )
+
+    # PNGs don't compress further; store them and spill large archives to disk
+    archive = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(["position", "title", "style", "status", "file", "generation_id", "error"])
+
+    with zipfile.ZipFile(archive, "w", compression=zipfile.ZIP_STORED) as zf:
+        for item in job.items:
+            filename = ""
+            image_url = images.get(item.generation_id)
+
+            if item.status == "done" and image_url:
+                image_bytes = get_storage().download_image(image_url)
+                if image_bytes:
+                    filename = f"{item.position + 1:04d}-{item.generation_id[:8]}.png"
+                    zf.writestr(filename, image_bytes)
+
+            writer.writerow(
+                [
+                    item.position + 1,
+                    item.title,
+                    item.style,
+                    item.status,
+                    filename,
+                    item.generation_id or "",
+                    item.error or "",
+                ]
+            )
+
+        zf.writestr("manifest.csv", manifest.getvalue())
+
+    archive.seek(0)
+    return send_file(
+        archive,
+        mimetype="application/zip",
+        as_attachment=True,
+        download_name=f"covers-{job.id[:8]}.zip",
+    )
@@ -18,11 +18,103 @@ class Config:
         "pool_recycle": 280,
     }
 
+    # Query instrumentation: log statements slower than SLOW_QUERY_MS, and flag
+    # requests that repeat one query shape more than QUERY_REPEAT_LIMIT times.
+    # With QUERY_REPEAT_STRICT such requests fail, which is meant for test runs.
+    SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 250))
+    QUERY_REPEAT_LIMIT = int(os.getenv("QUERY_REPEAT_LIMIT", 10))
+    QUERY_REPEAT_STRICT = os.getenv("QUERY_REPEAT_STRICT", "false").lower() == "true"
+
+    # Seconds a worker trusts its cached copy of a logged-in user's role
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+    # Users kept in that cache per worker; least recently seen are evicted first
+    USER_CACHE_ENTRIES = int(os.getenv("USER_CACHE_ENTRIES", 10000))
+
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
 
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     MOCK_MODE = os.getenv("MOCK_MODE", "false").lower() == "true"
 
+    PENDING_IMAGE_TTL = int(os.getenv("PENDING_IMAGE_TTL", 3600))
+    PREVIEW_MAX_WIDTH = int(os.getenv("PREVIEW_MAX_WIDTH", 800))
+    PREVIEW_QUALITY = int(os.getenv("PREVIEW_QUALITY", 80))
+
+    # Per-process budget for rendered covers (saved originals + overlay spec)
+    RENDER_CACHE_MB = int(os.getenv("RENDER_CACHE_MB", 64))
+
+    # Decode and render budget. Sources over IMAGE_MAX_DECODE_PIXELS are refused
+    # from their header, before decoding; requested outputs are capped per side
+    # and in total pixels; renders whose estimated peak memory exceeds
+    # IMAGE_MEMORY_BUDGET_MB are downscaled at decode (JPEG) or refused.
+    IMAGE_MAX_DECODE_PIXELS = int(os.getenv("IMAGE_MAX_DECODE_PIXELS", 40_000_000))
+    IMAGE_MAX_TARGET_PIXELS = int(os.getenv("IMAGE_MAX_TARGET_PIXELS", 16_000_000))
+    IMAGE_MAX_DIMENSION = int(os.getenv("IMAGE_MAX_DIMENSION", 8192))
+    IMAGE_MAX_FONT_SIZE = int(os.getenv("IMAGE_MAX_FONT_SIZE", 400))
+    IMAGE_MEMORY_BUDGET_MB = int(os.getenv("IMAGE_MEMORY_BUDGET_MB", 256))
+
+    # Process pool for CPU-bound image work: "0" runs inline, "auto" uses one
+    # worker per CPU. Beyond IMAGE_QUEUE_LIMIT waiting tasks, requests wait up
+    # to IMAGE_QUEUE_TIMEOUT seconds for a slot and are then rejected with 503.
+    IMAGE_WORKERS = os.getenv("IMAGE_WORKERS", "0")
+    IMAGE_QUEUE_LIMIT = int(os.getenv("IMAGE_QUEUE_LIMIT", 16))
+    IMAGE_QUEUE_TIMEOUT = float(os.getenv("IMAGE_QUEUE_TIMEOUT", 5))
+
+    # Background rendering of platform variants and thumbnails after save
+    BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+    THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", 480))
+
+    # Bulk generation: posts per batch and concurrent model calls per batch
+    BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 500))
+    BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", 4))
+    # Batches run on their own threads, apart from the background pool: at
+    # most BULK_WORKERS at once per process (more wait their turn), and at
+    # most BULK_MAX_JOBS_PER_USER queued or running per user per process
+    BULK_WORKERS = int(os.getenv("BULK_WORKERS", 2))
+    BULK_MAX_JOBS_PER_USER = int(os.getenv("BULK_MAX_JOBS_PER_USER", 1))
+    # A running batch with no progress for this long is assumed dead and may be resumed
+    BULK_STALE_SECONDS = int(os.getenv("BULK_STALE_SECONDS", 300))
+
+    # Speculative generation: the app page hints at the title and style once
+    # they stop changing, and the cover is generated before the user clicks.
+    # One speculation per user and SPECULATIVE_WORKERS per process; results not
+    # claimed by /api/generate within SPECULATIVE_TTL seconds are discarded.
+    SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_ENABLED", "false").lower() == "true"
+    SPECULATIVE_WORKERS = int(os.getenv("SPECULATIVE_WORKERS", 2))
+    SPECULATIVE_TTL = int(os.getenv("SPECULATIVE_TTL", 300))
+    SPECULATIVE_ADOPT_TIMEOUT = float(os.getenv("SPECULATIVE_ADOPT_TIMEOUT", 120))
+
+    # Draft links are fetched and summarized into the prompt. Responses are cut
+    # off at DRAFT_FETCH_MAX_BYTES and DRAFT_FETCH_TIMEOUT seconds; summaries
+    # are cached per URL and revalidated with ETag / Last-Modified after
+    # DRAFT_CACHE_TTL. Private addresses are refused unless explicitly allowed.
+    DRAFT_FETCH_ENABLED = os.getenv("DRAFT_FETCH_ENABLED", "true").lower() == "true"
+    DRAFT_FETCH_TIMEOUT = float(os.getenv("DRAFT_FETCH_TIMEOUT", 4))
+    DRAFT_FETCH_CONNECT_TIMEOUT = float(os.getenv("DRAFT_FETCH_CONNECT_TIMEOUT", 2))
+    DRAFT_FETCH_MAX_BYTES = int(os.getenv("DRAFT_FETCH_MAX_BYTES", 512 * 1024))
+    DRAFT_FETCH_POOL = int(os.getenv("DRAFT_FETCH_POOL", 10))
+    DRAFT_FETCH_ALLOW_PRIVATE = os.getenv("DRAFT_FETCH_ALLOW_PRIVATE", "false").lower() == "true"
+    DRAFT_CACHE_TTL = int(os.getenv("DRAFT_CACHE_TTL", 900))
+    DRAFT_ERROR_TTL = int(os.getenv("DRAFT_ERROR_TTL", 60))
+    DRAFT_CACHE_ENTRIES = int(os.getenv("DRAFT_CACHE_ENTRIES", 1024))
+    DRAFT_SUMMARY_CHARS = int(os.getenv("DRAFT_SUMMARY_CHARS", 400))
+
+    # JSON serialization: "auto" uses orjson when installed, "stdlib" forces json
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "auto").lower()
+
+    # On-the-fly br/gzip compression of JSON responses at least this large
+    COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 5))
+
+    GALLERY_PAGE_SIZE = int(os.getenv("GALLERY_PAGE_SIZE", 24))
+
+    ADMIN_ANALYTICS_CACHE_TTL = int(os.getenv("ADMIN_ANALYTICS_CACHE_TTL", 60))
+    ADMIN_ANALYTICS_STALE_TTL = int(os.getenv("ADMIN_ANALYTICS_STALE_TTL", 600))
+
+    # Admin on-demand request profiles (X-Profile: 1)
+    PROFILE_DIR = os.getenv("PROFILE_DIR")
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 50))
+
     GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME")
     GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID")
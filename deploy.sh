@@ -48,7 +48,7 @@ if [ -z "$GOOGLE_API_KEY" ]; then
 fi
 
 # Build the container
-echo -e "${YELLOW}Step 1/3: Building Docker image...${NC}"
+echo -e "${YELLOW}Step 1/4: Building Docker image...${NC}"
 docker build -t $IMAGE_NAME:latest .
 
 if [ $? -eq 0 ]; then
@@ -59,7 +59,7 @@ else
 fi
 
 # Push to Container Registry
-echo -e "${YELLOW}Step 2/3: Pushing to Google Container Registry...${NC}"
+echo -e "${YELLOW}Step 2/4: Pushing to Google Container Registry...${NC}"
 docker push $IMAGE_NAME:latest
 
 if [ $? -eq 0 ]; then
@@ -69,8 +69,18 @@ else
     exit 1
 fi
 
+# Upgrade the database schema before the new code serves any request
+echo -e "${YELLOW}Step 3/4: Upgrading database schema...${NC}"
+if [ ! -z "$DATABASE_URL" ]; then
+    docker run --rm -e DATABASE_URL="$DATABASE_URL" $IMAGE_NAME:latest flask --app app upgrade-schema
+    echo -e "${GREEN}✓ Schema upgraded${NC}\n"
+else
+    echo -e "${YELLOW}Warning: DATABASE_URL not set, skipping.${NC}"
+    echo -e "Run 'flask --app app upgrade-schema' against the production database before traffic reaches this version.\n"
+fi
+
 # Deploy to Cloud Run
-echo -e "${YELLOW}Step 3/3: Deploying to Cloud Run...${NC}"
+echo -e "${YELLOW}Step 4/4: Deploying to Cloud Run...${NC}"
 
 DEPLOY_CMD="gcloud run deploy $SERVICE_NAME \
   --image $IMAGE_NAME:latest \
@@ -82,9 +92,20 @@ DEPLOY_CMD="gcloud run deploy $SERVICE_NAME \
   --max-instances 10 \
   --port 8080"
 
-# Add environment variables if set
+# Environment variables, collected into one --set-env-vars (gcloud rejects it combined with --update-env-vars)
+ENV_VARS=""
 if [ ! -z "$GOOGLE_API_KEY" ]; then
-    DEPLOY_CMD="$DEPLOY_CMD --set-env-vars GOOGLE_API_KEY=$GOOGLE_API_KEY"
+    ENV_VARS="GOOGLE_API_KEY=$GOOGLE_API_KEY"
+fi
+
+# High-concurrency mode: gevent workers, and let Cloud Run route more requests per instance
+if [ "$SERVING_MODE" = "gevent" ]; then
+    ENV_VARS="${ENV_VARS:+$ENV_VARS,}SERVING_MODE=gevent"
+    DEPLOY_CMD="$DEPLOY_CMD --concurrency ${CONCURRENCY:-250}"
+fi
+
+if [ ! -z "$ENV_VARS" ]; then
+    DEPLOY_CMD="$DEPLOY_CMD --set-env-vars $ENV_VARS"
 fi
 
 # Execute deployment
@@ -0,0 +1,68 @@
+"""
+Gunicorn configuration.
+
+Two serving modes are supported, selected with SERVING_MODE:
+
+    threaded (default)  gthread workers; each in-flight request holds a thread,
+                        so concurrency is WORKERS x THREADS.
+
+    gevent              One greenlet per request. Model calls, GCS transfers
+                        and database I/O yield while they wait, so a single
+                        worker can hold WORKER_CONNECTIONS concurrent
+                        /api/generate requests. Needs the "gevent" extra:
+                        pip install ".[gevent]"
+
+Run with: gunicorn -c gunicorn.conf.py app:app
+
+With more than one worker, set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory so /metrics aggregates samples from every worker.
+"""
+import os
+import multiprocessing
+
+serving_mode = os.getenv("SERVING_MODE", "threaded").lower()
+
+bind = f":{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WORKERS", 1))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 0))
+
+if serving_mode == "gevent":
+    worker_class = "gevent"
+    worker_connections = int(os.getenv("WORKER_CONNECTIONS", 500))
+elif serving_mode == "threaded":
+    worker_class = "gthread"
+    threads = int(os.getenv("THREADS", 8))
+else:
+    raise ValueError(
+        f"Unknown SERVING_MODE {serving_mode!r}; expected 'threaded' or 'gevent'"
+    )
+
+
+def post_fork(server, worker):
+    if serving_mode != "gevent":
+        return
+
+    # psycopg2 blocks the whole worker unless it's told to cooperate with gevent
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        server.log.warning(
+            "psycogreen not installed; PostgreSQL queries will block the gevent worker"
+        )
+        return
+
+    patch_psycopg()
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def when_ready(server):
+    server.log.info(
+        f"Serving mode: {serving_mode} ({workers} workers, "
+        f"{multiprocessing.cpu_count()} CPUs available)"
+    )
@@ -1,6 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
+from collections import defaultdict
+from sqlalchemy import event, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
@@ -8,13 +12,23 @@ db = SQLAlchemy()
 
 class User(UserMixin, db.Model):
     __tablename__ = "users"
+    __table_args__ = (
+        db.Index('idx_users_generation_count', 'generation_count'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    # Usage totals, kept in step with generations by update_usage_counters
+    # below; `flask backfill-user-counters` recomputes them from scratch.
+    # Existing databases get these columns from `flask upgrade-schema`
+    generation_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    image_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    last_generated_at = db.Column(db.DateTime, nullable=True)
 
     generations = db.relationship(
         "Generation", backref="user", lazy=True, cascade="all, delete-orphan"
@@ -59,18 +73,135 @@ class GeneratedImage(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     generation_id = db.Column(
-        db.String(36), db.ForeignKey("generations.generation_id"), nullable=False
+        db.String(36),
+        db.ForeignKey("generations.generation_id"),
+        nullable=False,
+        index=True,
     )
     image_url = db.Column(db.String(500), nullable=False)
     index_number = db.Column(db.Integer, nullable=False)
+    # Text overlay to composite over the untouched original, see ImageProcessor.overlay_spec
+    overlay_spec = db.Column(db.JSON, nullable=True)
+    # Pre-rendered copies of the original: platform preset name or "thumbnail" -> storage path
+    variants = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    def storage_paths(self):
+        """Every stored object this image holds a reference to."""
+        return [self.image_url, *(self.variants or {}).values()]
+
     def __repr__(self):
         return f"<GeneratedImage {self.generation_id}[{self.index_number}]>"
 
 
+class StoredObject(db.Model):
+    """
+    Reference count for a content-addressed image in storage.
+
+    Images are stored once per SHA-256 digest; each GeneratedImage pointing
+    at the object holds one reference. When the last reference goes the row
+    stays behind as a tombstone (ref_count 0) until delete_stored_images
+    removes it together with the stored object, so a digest revived in the
+    meantime is re-uploaded rather than pointing at a deleted object.
+    """
+
+    __tablename__ = "stored_objects"
+
+    digest = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @classmethod
+    def _increment(cls, digest):
+        return db.session.execute(
+            db.update(cls)
+            .where(cls.digest == digest)
+            .values(ref_count=cls.ref_count + 1)
+            .returning(cls.ref_count)
+        ).scalar()
+
+    @classmethod
+    def acquire(cls, digest, size):
+        """
+        Add a reference to digest in the current transaction.
+
+        Returns:
+            bool: True if the object is new, or a tombstone whose stored copy
+                may be deleted, and so still needs uploading
+        """
+        count = cls._increment(digest)
+        if count is not None:
+            return count == 1
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(digest=digest, size=size, ref_count=1))
+        except IntegrityError:
+            # Another request inserted the same digest first
+            return cls._increment(digest) == 1
+        return True
+
+    @classmethod
+    def release(cls, digest):
+        """
+        Drop a reference to digest in the current transaction.
+
+        Returns:
+            bool: True if no references remain and the stored object can be
+                deleted (with reap) once the transaction commits
+        """
+        remaining = db.session.execute(
+            db.update(cls)
+            .where(cls.digest == digest)
+            .values(ref_count=cls.ref_count - 1)
+            .returning(cls.ref_count)
+        ).scalar()
+        return remaining is not None and remaining <= 0
+
+    @classmethod
+    def bury(cls, digest, size):
+        """
+        Record digest as an unreferenced tombstone in the current transaction,
+        for an object uploaded by a transaction that was then rolled back.
+        An existing row is left as it is.
+        """
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(digest=digest, size=size, ref_count=0))
+        except IntegrityError:
+            pass
+
+    @classmethod
+    def reap(cls, digest):
+        """
+        Delete digest's tombstone in the current transaction if it is still
+        unreferenced.
+
+        Delete the stored object before committing: the deleted row stays
+        locked until then, so a concurrent acquire either waits and then
+        uploads afresh, or has already revived the row and nothing is reaped.
+
+        Returns:
+            bool: True if the tombstone was removed
+        """
+        return db.session.execute(
+            db.delete(cls)
+            .where(cls.digest == digest, cls.ref_count <= 0)
+            .returning(cls.digest)
+        ).first() is not None
+
+    def __repr__(self):
+        return f"<StoredObject {self.digest[:12]} refs={self.ref_count}>"
+
+
 class Feedback(db.Model):
     __tablename__ = "feedback"
+    __table_args__ = (
+        db.Index('idx_feedback_status_created', 'status', 'created_at'),
+        db.Index('idx_feedback_type_created', 'feedback_type', 'created_at'),
+        db.Index('idx_feedback_created', 'created_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
@@ -86,3 +217,130 @@ class Feedback(db.Model):
 
     def __repr__(self):
         return f"<Feedback {self.id} - {self.feedback_type}>"
+
+
+class BulkJob(db.Model):
+    """A batch of posts to generate covers for, processed in the background."""
+
+    __tablename__ = "bulk_jobs"
+
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
+    # pending -> running -> completed | failed (some items failed; resumable)
+    status = db.Column(db.String(20), default="pending", nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    user = db.relationship(
+        "User", backref=db.backref("bulk_jobs", lazy=True, cascade="all, delete-orphan")
+    )
+    items = db.relationship(
+        "BulkJobItem",
+        backref="job",
+        lazy=True,
+        cascade="all, delete-orphan",
+        order_by="BulkJobItem.position",
+    )
+
+    def __repr__(self):
+        return f"<BulkJob {self.id} {self.status}>"
+
+
+class BulkJobItem(db.Model):
+    __tablename__ = "bulk_job_items"
+    __table_args__ = (
+        db.Index('idx_bulk_item_job_status', 'job_id', 'status'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(36), db.ForeignKey("bulk_jobs.id"), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(500), nullable=False)
+    style = db.Column(db.String(100), nullable=False)
+    draft_link = db.Column(db.String(500), nullable=True)
+    # pending | done | failed
+    status = db.Column(db.String(20), default="pending", nullable=False)
+    generation_id = db.Column(db.String(36), nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+
+    def __repr__(self):
+        return f"<BulkJobItem {self.job_id}[{self.position}] {self.status}>"
+
+
+def last_generated_expression():
+    """Correlated newest-generation time for the users row being updated."""
+    return (
+        select(func.max(Generation.created_at))
+        .where(Generation.user_id == User.id)
+        .scalar_subquery()
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def update_usage_counters(session, flush_context):
+    """
+    Apply this flush's generation and image inserts and deletes to the
+    owners' usage counters, in the same transaction.
+
+    Counts change by delta (UPDATE ... SET n = n + delta) so concurrent
+    saves for one user don't overwrite each other; last_generated_at is
+    re-read from the user's newest generation.
+    """
+    changes = [(obj, 1) for obj in session.new] + [(obj, -1) for obj in session.deleted]
+    if not any(isinstance(obj, (Generation, GeneratedImage)) for obj, _ in changes):
+        return
+
+    owners = {
+        obj.generation_id: obj.user_id for obj, _ in changes if isinstance(obj, Generation)
+    }
+    deltas = defaultdict(lambda: [0, 0])
+
+    for obj, sign in changes:
+        if isinstance(obj, Generation):
+            deltas[obj.user_id][0] += sign
+        elif isinstance(obj, GeneratedImage):
+            user_id = owners.get(obj.generation_id)
+            if user_id is None:
+                user_id = session.connection().execute(
+                    select(Generation.user_id).where(
+                        Generation.generation_id == obj.generation_id
+                    )
+                ).scalar()
+            if user_id is not None:
+                deltas[user_id][1] += sign
+
+    connection = session.connection()
+    for user_id, (generations, images) in deltas.items():
+        values = {"image_count": User.image_count + images}
+        if generations:
+            values["generation_count"] = User.generation_count + generations
+            values["last_generated_at"] = last_generated_expression()
+        connection.execute(update(User).where(User.id == user_id).values(**values))
+
+
+def backfill_usage_counters():
+    """
+    Recompute every user's usage counters from the generations tables.
+
+    Returns:
+        int: Number of users updated
+    """
+    image_counts = (
+        select(func.count(GeneratedImage.id))
+        .join(Generation, Generation.generation_id == GeneratedImage.generation_id)
+        .where(Generation.user_id == User.id)
+        .scalar_subquery()
+    )
+    generation_counts = (
+        select(func.count(Generation.id)).where(Generation.user_id == User.id).scalar_subquery()
+    )
+
+    updated = db.session.execute(
+        update(User).values(
+            generation_count=generation_counts,
+            image_count=image_counts,
+            last_generated_at=last_generated_expression(),
+        )
+    ).rowcount
+    db.session.commit()
+    return updated
@@ -7,18 +7,31 @@ from flask import (
     redirect,
     url_for,
     session,
+    current_app,
 )
 import uuid
 import io
-import base64
+import json
+import hashlib
 import logging
+import threading
 from flask_login import login_user, logout_user, login_required, current_user
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 
-from models import db, User, Generation, GeneratedImage, Feedback
+from config import Config
+from models import db, User, Generation, GeneratedImage, Feedback, StoredObject
 from utils.image_generator import NanoBananaClient
-from utils.image_processor import ImageProcessor
+from utils.image_processor import ImageProcessor, ImageTooLarge
 from utils.storage import GCSStorage
+from utils.pagination import keyset_page, parse_limit
+from utils.pending_store import PendingImageStore
+from utils.metrics import track_stage
+from utils.user_cache import user_cache
+from utils.search import matches
+from utils.cache import RenderCache
+from utils.background import run_in_background
+from utils.process_pool import get_pool, run_image_task, ImagePoolBusy
+from utils.speculative import SpeculativeGenerator
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -26,13 +39,16 @@ logger = logging.getLogger(__name__)
 # Lazy initialization for services
 _client = None
 _storage = None
+_services_lock = threading.Lock()
 
 
 def get_client():
     """Lazy initialization of NanoBananaClient."""
     global _client
     if _client is None:
-        _client = NanoBananaClient()
+        with _services_lock:
+            if _client is None:
+                _client = NanoBananaClient()
     return _client
 
 
@@ -40,12 +56,212 @@ def get_storage():
     """Lazy initialization of GCSStorage."""
     global _storage
     if _storage is None:
-        _storage = GCSStorage()
+        with _services_lock:
+            if _storage is None:
+                _storage = GCSStorage()
     return _storage
 
 
+def store_image(image_bytes, ext="png", uploads=None):
+    """
+    Store image bytes content-addressed and take a reference to them.
+
+    Call inside the transaction that records the reference; the upload is
+    skipped when the same bytes are already stored. Pass a list as uploads
+    to collect (digest, size, path) for each object actually uploaded, so
+    they can be handed to discard_uploads if the transaction rolls back.
+
+    Returns:
+        str: Storage path for GeneratedImage.image_url
+    """
+    storage = get_storage()
+    digest = storage.content_digest(image_bytes)
+
+    if StoredObject.acquire(digest, len(image_bytes)):
+        path = storage.upload_content(image_bytes, digest, ext)
+        if uploads is not None:
+            uploads.append((digest, len(image_bytes), path))
+        return path
+    return storage.content_path(digest, ext)
+
+
+def discard_uploads(uploads):
+    """
+    Delete objects store_image uploaded in a transaction that rolled back.
+
+    Call after the rollback. Each object is recorded as a tombstone and then
+    goes through delete_stored_images, so one that another record has
+    referenced in the meantime is kept.
+    """
+    if not uploads:
+        return
+    try:
+        for digest, size, _ in uploads:
+            StoredObject.bury(digest, size)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning(f"Error recording discarded uploads: {e}")
+        return
+    delete_stored_images([path for _, _, path in uploads])
+
+
+def release_image(storage_path):
+    """
+    Drop a reference to a stored image inside the current transaction.
+
+    Returns:
+        str or None: The path to delete from storage once the transaction
+            commits, or None while other records still use the object
+    """
+    digest = GCSStorage.digest_from_path(storage_path)
+    if digest is None:
+        # Legacy per-user path, owned by exactly one record
+        return storage_path
+    return storage_path if StoredObject.release(digest) else None
+
+
+def render_version(image):
+    """Short hash identifying the rendering of a saved image and its overlay spec."""
+    spec = json.dumps(image.overlay_spec, sort_keys=True)
+    return hashlib.sha256(f"{image.image_url}|{spec}".encode("utf-8")).hexdigest()[:16]
+
+
+def render_saved_image(image, platform=None, custom_dims=None, overlay_spec=None):
+    """
+    Composite an overlay spec over a saved original, through the render cache.
+
+    Pass image.overlay_spec to render the saved overlay; None renders the
+    plain original. Originals are never rewritten, so the storage path, size
+    and spec fully identify the result.
+
+    Raises:
+        FileNotFoundError: If the original is missing from storage
+    """
+    key = (
+        image.image_url,
+        platform,
+        json.dumps(custom_dims, sort_keys=True),
+        json.dumps(overlay_spec, sort_keys=True),
+    )
+
+    def render():
+        original = get_storage().download_image(image.image_url)
+        if not original:
+            raise FileNotFoundError(image.image_url)
+        return run_image_task(
+            ImageProcessor.process_image, original, platform, custom_dims, overlay_spec
+        )
+
+    return RENDERED_IMAGES.get(key, render)
+
+
+def render_variants(image_id, original):
+    """
+    Render and store every platform preset and a thumbnail for a saved image.
+
+    Runs on the background pool after save. Downloads fall back to rendering
+    on demand until the variants are recorded on the GeneratedImage.
+    """
+    rendered = {
+        platform: (run_image_task(ImageProcessor.process_image, original, platform), "png")
+        for platform in ImageProcessor.PLATFORM_DIMENSIONS
+    }
+    rendered["thumbnail"] = (
+        run_image_task(
+            ImageProcessor.create_preview,
+            original,
+            max_width=Config.THUMBNAIL_WIDTH,
+            fmt="WEBP",
+            quality=Config.PREVIEW_QUALITY,
+        ),
+        "webp",
+    )
+
+    image = db.session.get(GeneratedImage, image_id)
+    if image is None or image.variants:
+        # Deleted while rendering, or another task got there first
+        return
+
+    uploads = []
+    try:
+        image.variants = {
+            name: store_image(image_bytes, ext, uploads)
+            for name, (image_bytes, ext) in rendered.items()
+        }
+        with track_stage("db_commit"):
+            db.session.commit()
+    except Exception:
+        # Includes the image being deleted between the check above and the commit
+        db.session.rollback()
+        discard_uploads(uploads)
+        raise
+
+    logger.info(f"Stored {len(rendered)} variants for image {image_id}")
+
+
+def schedule_variants(image, original):
+    """Queue background rendering of a freshly saved image's variants."""
+    run_in_background(current_app._get_current_object(), render_variants, image.id, original)
+
+
+def streamed_response(chunks, mimetype, size=None, download_name=None):
+    """
+    Response whose body is sent chunk by chunk as the iterator produces it.
+
+    Pass size when it is known up front so clients get a Content-Length;
+    download_name marks the response as an attachment.
+    """
+    response = current_app.response_class(
+        chunks, mimetype=mimetype, direct_passthrough=True
+    )
+    if size is not None:
+        response.content_length = size
+    if download_name:
+        response.headers.set("Content-Disposition", "attachment", filename=download_name)
+    return response
+
+
+def delete_stored_images(storage_paths):
+    """
+    Delete unreferenced objects from storage after the DB commit.
+
+    Each content-addressed object is deleted inside the transaction that
+    reaps its tombstone, and only if nothing has re-acquired it since; on a
+    storage error the tombstone is kept and the next acquire re-uploads.
+    """
+    for path in storage_paths:
+        digest = GCSStorage.digest_from_path(path)
+        try:
+            if digest is not None and not StoredObject.reap(digest):
+                db.session.rollback()
+                continue
+            get_storage().delete_image(path)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f"Error deleting image from GCS: {e}")
+
+
 # In-memory storage for generated images (before saving to database)
-GENERATED_IMAGES = {}
+GENERATED_IMAGES = PendingImageStore(ttl=Config.PENDING_IMAGE_TTL)
+
+# Covers generated ahead of /api/generate from the app page's prefetch hints
+SPECULATIONS = SpeculativeGenerator(
+    GENERATED_IMAGES, workers=Config.SPECULATIVE_WORKERS, ttl=Config.SPECULATIVE_TTL
+)
+
+STYLES = [
+    "Creative",
+    "Cinematic",
+    "Minimalist",
+    "Professional",
+    "Abstract",
+    "Tech",
+]
+
+# Saved covers rendered with their overlay spec, keyed by original + size + spec
+RENDERED_IMAGES = RenderCache(max_bytes=Config.RENDER_CACHE_MB * 1024 * 1024)
 
 # Create blueprint
 main_bp = Blueprint("main", __name__)
@@ -90,6 +306,7 @@ def signup():
             selected_index = pending_gen.get("selected_index")
 
             if selected_index is not None:
+                uploads = []
                 try:
                     generation_id = pending_gen["generation_id"]
                     images_data = GENERATED_IMAGES[generation_id]
@@ -106,10 +323,7 @@ def signup():
                         )
                         db.session.add(generation)
 
-                        filename = f"{generation_id}.png"
-                        storage_path = get_storage().upload_image(
-                            img_bytes, filename, username=user.username
-                        )
+                        storage_path = store_image(img_bytes, uploads=uploads)
 
                         generated_image = GeneratedImage(
                             generation_id=generation_id,
@@ -117,7 +331,11 @@ def signup():
                             index_number=0,
                         )
                         db.session.add(generated_image)
-                        db.session.commit()
+                        with track_stage("db_commit"):
+                            db.session.commit()
+                        uploads = []
+
+                        schedule_variants(generated_image, img_bytes)
 
                     del GENERATED_IMAGES[generation_id]
                     session.pop("pending_generation", None)
@@ -125,6 +343,7 @@ def signup():
                 except Exception as e:
                     logger.error(f"Error saving pending generation: {e}")
                     db.session.rollback()
+                    discard_uploads(uploads)
 
         return jsonify({"success": True, "redirect": url_for("main.app_page")})
 
@@ -158,6 +377,7 @@ def login():
 @main_bp.route("/logout")
 @login_required
 def logout():
+    user_cache.invalidate(current_user.id)
     logout_user()
     return redirect(url_for("main.landing"))
 
@@ -174,30 +394,124 @@ def landing():
 
 @main_bp.route("/app")
 def app_page():
-    return render_template("app.html")
+    return render_template("app.html", speculative=Config.SPECULATIVE_ENABLED)
 
 
-@main_bp.route("/dashboard")
-@login_required
-def dashboard():
-    # Use joinedload to prevent N+1 queries
-    user_generations = (
-        Generation.query.filter_by(user_id=current_user.id)
-        .options(joinedload(Generation.images))
-        .order_by(Generation.created_at.desc())
-        .all()
+def gallery_page(cursor=None, limit=None, search=None):
+    """
+    Fetch one page of the current user's generations, newest first.
+
+    Seeks on the (user_id, created_at) index and loads images for the page
+    only, so the cost of a page does not depend on the size of the gallery.
+    """
+    query = Generation.query.filter_by(user_id=current_user.id).options(
+        selectinload(Generation.images)
+    )
+    if search:
+        query = query.filter(matches(Generation, Generation.title, search))
+
+    return keyset_page(
+        query,
+        Generation.created_at,
+        Generation.id,
+        cursor=cursor,
+        limit=parse_limit(limit, default=current_app.config["GALLERY_PAGE_SIZE"]),
     )
 
-    for generation in user_generations:
+
+def attach_display_urls(generations):
+    """Set display_url on each image from its storage path."""
+    for generation in generations:
         for image in generation.images:
             if not image.image_url:
                 image.display_url = None
                 continue
 
-            # Use the full storage path (e.g., "admin/uuid.png")
-            image.display_url = url_for("main.serve_image", filename=image.image_url)
+            variants = image.variants or {}
+            image.thumbnail_url = None
+            if "thumbnail" in variants and not image.overlay_spec:
+                image.thumbnail_url = url_for("main.serve_image", filename=variants["thumbnail"])
+
+            if image.overlay_spec:
+                image.display_url = url_for(
+                    "main.serve_rendered_image",
+                    generation_id=generation.generation_id,
+                    v=render_version(image),
+                )
+            else:
+                # Use the full storage path (e.g., "objects/ab/<digest>.png")
+                image.display_url = url_for("main.serve_image", filename=image.image_url)
+
+
+def serialize_generation(generation):
+    image = generation.images[0] if generation.images else None
+
+    return {
+        "generation_id": generation.generation_id,
+        "title": generation.title,
+        "style": generation.style,
+        "created_at": generation.created_at.isoformat(),
+        "image_url": image.display_url if image else None,
+        "thumbnail_url": image.thumbnail_url if image else None,
+    }
+
+
+@main_bp.route("/dashboard")
+@login_required
+def dashboard():
+    user_generations, next_cursor = gallery_page()
+    attach_display_urls(user_generations)
+
+    total_count = (
+        db.session.query(User.generation_count).filter(User.id == current_user.id).scalar()
+    )
+
+    return render_template(
+        "dashboard.html",
+        generations=user_generations,
+        next_cursor=next_cursor,
+        total_count=total_count,
+    )
+
+
+@main_bp.route("/api/gallery", methods=["GET"])
+@login_required
+def gallery():
+    """Get a page of the current user's saved generations, optionally searched by title (?q=)."""
+    generations, next_cursor = gallery_page(
+        cursor=request.args.get("cursor"),
+        limit=request.args.get("limit"),
+        search=request.args.get("q", "").strip(),
+    )
+    attach_display_urls(generations)
+
+    return jsonify(
+        {
+            "generations": [serialize_generation(gen) for gen in generations],
+            "next_cursor": next_cursor,
+        }
+    )
 
-    return render_template("dashboard.html", generations=user_generations)
+
+@main_bp.route("/api/usage", methods=["GET"])
+@login_required
+def usage():
+    """The current user's generation and image totals."""
+    row = (
+        db.session.query(User.generation_count, User.image_count, User.last_generated_at)
+        .filter(User.id == current_user.id)
+        .one()
+    )
+
+    return jsonify(
+        {
+            "generation_count": row.generation_count,
+            "image_count": row.image_count,
+            "last_generated_at": (
+                row.last_generated_at.isoformat() if row.last_generated_at else None
+            ),
+        }
+    )
 
 
 # ============================================================================
@@ -205,6 +519,45 @@ def dashboard():
 # ============================================================================
 
 
+def speculation_owner():
+    """Key speculative work is capped by: the user, or a per-session token when anonymous."""
+    if current_user.is_authenticated:
+        return f"user:{current_user.id}"
+    if "speculation_owner" not in session:
+        session["speculation_owner"] = uuid.uuid4().hex
+    return f"session:{session['speculation_owner']}"
+
+
+@main_bp.route("/api/generate/prefetch", methods=["POST"])
+def prefetch_generation():
+    """
+    Hint that the user is about to generate with this title and style.
+
+    Starts a speculative generation that a matching /api/generate will adopt.
+    Returns 202 when started, 200 when the same input is already pending or
+    ready, and 429 when the user or the process is at its speculation cap.
+    """
+    if not Config.SPECULATIVE_ENABLED:
+        return jsonify({"error": "Speculative generation is disabled"}), 404
+
+    data = request.get_json(silent=True) or {}
+    title = data.get("title")
+    if not title:
+        return jsonify({"error": "Title is required"}), 400
+
+    status = SPECULATIONS.start(
+        speculation_owner(),
+        get_client().generate_images,
+        title,
+        data.get("style"),
+        data.get("draft_link"),
+    )
+
+    if status == "busy":
+        return jsonify({"status": status}), 429, {"Retry-After": "5"}
+    return jsonify({"status": status}), 202 if status == "started" else 200
+
+
 @main_bp.route("/api/generate", methods=["POST"])
 def generate():
     """Generate blog cover images using AI."""
@@ -217,17 +570,33 @@ def generate():
         return jsonify({"error": "Title is required"}), 400
 
     try:
-        images_data = get_client().generate_images(title, style, draft_link)
+        generation_id = None
+        if Config.SPECULATIVE_ENABLED:
+            with track_stage("speculative_wait"):
+                generation_id = SPECULATIONS.adopt(
+                    speculation_owner(),
+                    title,
+                    style,
+                    draft_link,
+                    timeout=Config.SPECULATIVE_ADOPT_TIMEOUT,
+                )
+
+        if generation_id is not None:
+            images_data = GENERATED_IMAGES[generation_id]
+        else:
+            images_data = get_client().generate_images(title, style, draft_link)
 
-        image_urls = []
-        generation_id = str(uuid.uuid4())
-        GENERATED_IMAGES[generation_id] = []
+            generation_id = str(uuid.uuid4())
+            GENERATED_IMAGES[generation_id] = list(images_data)
 
-        for img_bytes in images_data:
-            b64_img = base64.b64encode(img_bytes).decode("utf-8")
-            data_url = f"data:image/png;base64,{b64_img}"
-            image_urls.append(data_url)
-            GENERATED_IMAGES[generation_id].append(img_bytes)
+        image_urls = [
+            url_for("main.preview_image", generation_id=generation_id, index=i)
+            for i in range(len(images_data))
+        ]
+        full_image_urls = [
+            url_for("main.preview_image", generation_id=generation_id, index=i, full=1)
+            for i in range(len(images_data))
+        ]
 
         session["pending_generation"] = {
             "generation_id": generation_id,
@@ -236,17 +605,60 @@ def generate():
             "draft_link": draft_link,
         }
 
-        return jsonify({"images": image_urls, "generation_id": generation_id})
+        return jsonify(
+            {
+                "images": image_urls,
+                "full_images": full_image_urls,
+                "generation_id": generation_id,
+                "expires_in": GENERATED_IMAGES.expires_in(generation_id),
+            }
+        )
 
     except Exception as e:
         logger.error(f"Error generating images: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+@main_bp.route("/api/preview/<generation_id>/<int:index>", methods=["GET"])
+def preview_image(generation_id, index):
+    """Serve a pending generated image as a downscaled preview, or the original with ?full=1."""
+    try:
+        max_age = GENERATED_IMAGES.expires_in(generation_id)
+
+        if request.args.get("full"):
+            image_bytes = GENERATED_IMAGES[generation_id][index]
+            mimetype = "image/png"
+        else:
+            accepts_webp = "image/webp" in request.headers.get("Accept", "")
+            fmt = "WEBP" if accepts_webp else "JPEG"
+            mimetype = "image/webp" if accepts_webp else "image/jpeg"
+
+            image_bytes = GENERATED_IMAGES.get_preview(
+                generation_id,
+                index,
+                fmt,
+                lambda original: run_image_task(
+                    ImageProcessor.create_preview,
+                    original,
+                    max_width=current_app.config["PREVIEW_MAX_WIDTH"],
+                    fmt=fmt,
+                    quality=current_app.config["PREVIEW_QUALITY"],
+                ),
+            )
+    except (KeyError, IndexError):
+        return jsonify({"error": "Preview expired or not found"}), 404
+
+    response = send_file(io.BytesIO(image_bytes), mimetype=mimetype, max_age=max_age)
+    response.headers["Cache-Control"] = f"private, max-age={max_age}"
+    response.vary.add("Accept")
+    return response
+
+
 @main_bp.route("/api/save-selection", methods=["POST"])
 @login_required
 def save_selection():
     """Save the user's selected image to database and GCS."""
+    uploads = []
     try:
         data = request.json
         generation_id = data.get("generation_id")
@@ -273,10 +685,7 @@ def save_selection():
         )
         db.session.add(generation)
 
-        filename = f"{generation_id}.png"
-        storage_path = get_storage().upload_image(
-            img_bytes, filename, username=current_user.username
-        )
+        storage_path = store_image(img_bytes, uploads=uploads)
 
         generated_image = GeneratedImage(
             generation_id=generation_id,
@@ -284,7 +693,12 @@ def save_selection():
             index_number=0,
         )
         db.session.add(generated_image)
-        db.session.commit()
+        with track_stage("db_commit"):
+            db.session.commit()
+        # Committed, so a later failure must not discard the stored image
+        uploads = []
+
+        schedule_variants(generated_image, img_bytes)
 
         del GENERATED_IMAGES[generation_id]
         session.pop("pending_generation", None)
@@ -293,6 +707,7 @@ def save_selection():
 
     except Exception as e:
         db.session.rollback()
+        discard_uploads(uploads)
         logger.error(f"Error saving selection: {e}")
         return jsonify({"error": "Failed to save image"}), 500
 
@@ -341,9 +756,32 @@ def download():
         return jsonify({"error": "Invalid generation ID"}), 404
 
     try:
-        # Get image bytes from memory or database
+        download_name = f"blog-cover-{platform.lower()}.png"
+
+        # Refuse oversized requests before fetching or decoding anything
+        ImageProcessor.check_request(platform, custom_dims, text_overlay)
+
         if generation_id in GENERATED_IMAGES:
             original_image_bytes = GENERATED_IMAGES[generation_id][index]
+
+            if get_pool() is None:
+                # Encode straight into the response body instead of buffering the PNG
+                img = ImageProcessor.prepare_image(
+                    original_image_bytes, platform, custom_dims, text_overlay
+                )
+                if img is not None:
+                    return streamed_response(
+                        ImageProcessor.iter_encoded(img), "image/png", download_name=download_name
+                    )
+                processed_image_bytes = original_image_bytes
+            else:
+                processed_image_bytes = run_image_task(
+                    ImageProcessor.process_image,
+                    original_image_bytes,
+                    platform,
+                    custom_dims,
+                    text_overlay,
+                )
         else:
             generation = Generation.query.filter_by(
                 generation_id=generation_id
@@ -359,72 +797,120 @@ def download():
 
             image_record = images[0]
 
-            original_image_bytes = get_storage().download_image(image_record.image_url)
-
-            if not original_image_bytes:
-                return jsonify({"error": "Image not found in storage"}), 404
-
-        # Process image
-        processed_image_bytes = ImageProcessor.process_image(
-            original_image_bytes, platform, custom_dims, text_overlay
-        )
-
-        # If text overlay was applied and this is a saved generation, update the stored image
-        if text_overlay and text_overlay.get('text') and generation_id not in GENERATED_IMAGES:
-            try:
-                generation = Generation.query.filter_by(
-                    generation_id=generation_id
-                ).first()
-
-                if generation and generation.images:
-                    # Get the original image with text overlay (no resizing)
-                    image_with_text = ImageProcessor.process_image(
-                        original_image_bytes,
-                        platform=None,  # No resizing, just apply text
-                        custom_dims=None,
-                        text_overlay=text_overlay
-                    )
-
-                    # Update the stored image
-                    image_record = generation.images[0]
-                    filename = f"{generation_id}.png"
-                    username = generation.user.username if generation.user else 'default'
-
-                    get_storage().upload_image(
-                        image_with_text, filename, username=username
+            # Overlay edits on a saved generation only update its spec; the
+            # original stays untouched and the composite is rendered on demand.
+            # A missing text_overlay keeps the saved spec, an empty one clears it.
+            if "text_overlay" in data:
+                spec = ImageProcessor.overlay_spec(text_overlay)
+            else:
+                spec = image_record.overlay_spec
+
+            if (
+                spec != image_record.overlay_spec
+                and current_user.is_authenticated
+                and generation.user_id == current_user.id
+            ):
+                image_record.overlay_spec = spec
+                with track_stage("db_commit"):
+                    db.session.commit()
+                logger.info(f"Updated overlay spec for generation {generation_id}")
+
+            variant_path = None
+            if not spec and not custom_dims:
+                variant_path = (image_record.variants or {}).get(platform)
+
+            if variant_path:
+                stream = get_storage().stream_image(variant_path)
+                if stream is not None:
+                    chunks, size = stream
+                    return streamed_response(
+                        chunks, "image/png", size=size, download_name=download_name
                     )
 
-                    logger.info(f"Updated stored image with text overlay for generation {generation_id}")
-            except Exception as e:
-                logger.error(f"Error updating stored image with text overlay: {e}")
-                # Don't fail the download if storage update fails
+            try:
+                processed_image_bytes = render_saved_image(
+                    image_record, platform, custom_dims, spec
+                )
+            except FileNotFoundError:
+                return jsonify({"error": "Image not found in storage"}), 404
 
         return send_file(
             io.BytesIO(processed_image_bytes),
             mimetype="image/png",
             as_attachment=True,
-            download_name=f"blog-cover-{platform.lower()}.png",
+            download_name=download_name,
         )
+    except (ImagePoolBusy, ImageTooLarge):
+        raise
     except Exception as e:
+        db.session.rollback()
         logger.error(f"Error downloading image: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+@main_bp.route("/rendered/<generation_id>")
+@login_required
+def serve_rendered_image(generation_id):
+    """Serve a saved cover with its overlay spec composited on."""
+    image = (
+        GeneratedImage.query.join(Generation)
+        .filter(
+            Generation.generation_id == generation_id,
+            Generation.user_id == current_user.id,
+        )
+        .order_by(GeneratedImage.index_number)
+        .first()
+    )
+
+    if image is None:
+        return jsonify({"error": "Image not found"}), 404
+
+    try:
+        image_bytes = render_saved_image(image, overlay_spec=image.overlay_spec)
+    except FileNotFoundError:
+        return jsonify({"error": "Image not found"}), 404
+
+    # The URL carries the render version, so this response never changes
+    response = send_file(
+        io.BytesIO(image_bytes),
+        mimetype="image/png",
+        etag=render_version(image),
+        max_age=31536000,
+    )
+    response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
+
+
 @main_bp.route("/images/<path:filename>")
 @login_required
 def serve_image(filename):
     """Serve images from GCS through Flask with authentication."""
     try:
-        image_bytes = get_storage().download_image(filename)
+        digest = GCSStorage.digest_from_path(filename)
+
+        # Content-addressed objects never change, so a matching ETag needs no download
+        if digest and digest in request.if_none_match:
+            response = current_app.response_class(status=304)
+            response.set_etag(digest)
+            response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+            return response
 
-        if image_bytes is None:
+        stream = get_storage().stream_image(filename)
+
+        if stream is None:
             return jsonify({"error": "Image not found"}), 404
 
-        return send_file(
-            io.BytesIO(image_bytes),
-            mimetype="image/png",
-            max_age=3600,
-        )
+        chunks, size = stream
+
+        if digest:
+            response = streamed_response(chunks, GCSStorage.content_type(filename), size=size)
+            response.set_etag(digest)
+            response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+            return response
+
+        response = streamed_response(chunks, "image/png", size=size)
+        response.headers["Cache-Control"] = "public, max-age=3600"
+        return response
     except Exception as e:
         logger.error(f"Error serving image {filename}: {e}")
         return jsonify({"error": "Failed to load image"}), 500
@@ -447,16 +933,19 @@ def delete_generation(generation_id):
         if not generation:
             return jsonify({"error": "Generation not found"}), 404
 
-        # Delete images from storage
-        for image in generation.images:
-            try:
-                get_storage().delete_image(image.image_url)
-            except Exception as e:
-                logger.warning(f"Error deleting image from GCS: {e}")
+        stale_paths = [
+            release_image(path)
+            for image in generation.images
+            for path in image.storage_paths()
+        ]
 
         # Delete from database
         db.session.delete(generation)
-        db.session.commit()
+        with track_stage("db_commit"):
+            db.session.commit()
+
+        # Delete images nothing else references from storage
+        delete_stored_images([path for path in stale_paths if path])
 
         return jsonify(
             {"success": True, "message": "Generation deleted successfully"}
@@ -476,15 +965,7 @@ def delete_generation(generation_id):
 @main_bp.route("/api/styles", methods=["GET"])
 def get_styles():
     """Get available image styles."""
-    styles = [
-        "Creative",
-        "Cinematic",
-        "Minimalist",
-        "Professional",
-        "Abstract",
-        "Tech",
-    ]
-    return jsonify(styles)
+    return jsonify(STYLES)
 
 
 @main_bp.route("/api/platforms", methods=["GET"])
@@ -36,12 +36,24 @@ async function loadStats() {
 
 // User Management
 let allUsersData = [];
+let usersCursor = null;
+let usersSearchQuery = '';
+let usersSearchTimer = null;
 
-async function loadAllUsers() {
+async function loadAllUsers(append = false) {
     try {
-        const response = await fetch('/admin/api/users');
-        allUsersData = await response.json();
+        const params = new URLSearchParams();
+        if (usersSearchQuery) params.set('q', usersSearchQuery);
+        if (append && usersCursor) params.set('cursor', usersCursor);
+
+        const response = await fetch(`/admin/api/users?${params}`);
+        const data = await response.json();
+
+        allUsersData = append ? allUsersData.concat(data.users) : data.users;
+        usersCursor = data.next_cursor;
+
         renderUsers(allUsersData);
+        document.getElementById('users-load-more').classList.toggle('hidden', !usersCursor);
     } catch (error) {
         console.error('Error loading users:', error);
     }
@@ -79,19 +91,13 @@ function renderUsers(users) {
 }
 
 function searchUsers(query) {
-    const lowercaseQuery = query.toLowerCase().trim();
-    
-    if (!lowercaseQuery) {
-        renderUsers(allUsersData);
-        return;
-    }
-    
-    const filtered = allUsersData.filter(user => 
-        user.username.toLowerCase().includes(lowercaseQuery) ||
-        user.email.toLowerCase().includes(lowercaseQuery)
-    );
-    
-    renderUsers(filtered);
+    clearTimeout(usersSearchTimer);
+
+    // Debounce so each keystroke doesn't hit the server
+    usersSearchTimer = setTimeout(() => {
+        usersSearchQuery = query.trim();
+        loadAllUsers();
+    }, 300);
 }
 
 async function promoteUser(userId, username) {
@@ -162,7 +168,7 @@ async function deleteUser(userId, username) {
 async function loadRecentGenerations() {
     try {
         const response = await fetch('/admin/api/recent-generations');
-        const generations = await response.json();
+        const { generations } = await response.json();
 
         const tbody = document.querySelector('#recent-generations-table tbody');
         tbody.innerHTML = generations.map(gen => `
@@ -237,33 +243,54 @@ async function loadTopUsers() {
 
 // Feedback Management
 let allFeedbackData = [];
+let feedbackCursor = null;
+let feedbackSearchQuery = '';
+let feedbackSearchTimer = null;
+
+function feedbackParams() {
+    const params = new URLSearchParams();
+    const typeFilter = document.getElementById('feedback-type-filter').value;
+    if (typeFilter !== 'all') params.set('type', typeFilter);
+    if (feedbackSearchQuery) params.set('q', feedbackSearchQuery);
+    return params;
+}
 
-async function loadFeedback() {
+function searchFeedback(query) {
+    clearTimeout(feedbackSearchTimer);
+
+    feedbackSearchTimer = setTimeout(() => {
+        feedbackSearchQuery = query.trim();
+        loadFeedback();
+    }, 300);
+}
+
+async function loadFeedback(append = false) {
     try {
-        const response = await fetch('/admin/api/feedback');
-        allFeedbackData = await response.json();
+        const params = feedbackParams();
+        if (append && feedbackCursor) params.set('cursor', feedbackCursor);
+
+        const response = await fetch(`/admin/api/feedback?${params}`);
+        const data = await response.json();
 
-        filterAndRenderFeedback();
+        allFeedbackData = append ? allFeedbackData.concat(data.feedback) : data.feedback;
+        feedbackCursor = data.next_cursor;
+
+        renderFeedback(allFeedbackData);
+        document.getElementById('feedback-load-more').classList.toggle('hidden', !feedbackCursor);
     } catch (error) {
         console.error('Error loading feedback:', error);
     }
 }
 
-function filterAndRenderFeedback() {
-    const typeFilter = document.getElementById('feedback-type-filter').value;
+function renderFeedback(feedbackList) {
     const tbody = document.querySelector('#feedback-table tbody');
 
-    let filteredFeedback = allFeedbackData;
-    if (typeFilter !== 'all') {
-        filteredFeedback = allFeedbackData.filter(fb => fb.type === typeFilter);
-    }
-
-    if (filteredFeedback.length === 0) {
+    if (feedbackList.length === 0) {
         tbody.innerHTML = '<tr><td colspan="6" class="loading">No feedback found</td></tr>';
         return;
     }
 
-    tbody.innerHTML = filteredFeedback.map(fb => `
+    tbody.innerHTML = feedbackList.map(fb => `
         <tr>
             <td>
                 <span class="feedback-type-badge feedback-type-${fb.type}">
@@ -313,12 +340,28 @@ async function deleteFeedback(feedbackId) {
     }
 }
 
-function exportFeedbackCSV() {
+async function exportFeedbackCSV() {
     const typeFilter = document.getElementById('feedback-type-filter').value;
-    let feedbackToExport = allFeedbackData;
+    let feedbackToExport = [];
+    let cursor = null;
 
-    if (typeFilter !== 'all') {
-        feedbackToExport = allFeedbackData.filter(fb => fb.type === typeFilter);
+    // Export every matching row, not only the pages loaded so far
+    try {
+        do {
+            const params = feedbackParams();
+            params.set('limit', '200');
+            if (cursor) params.set('cursor', cursor);
+
+            const response = await fetch(`/admin/api/feedback?${params}`);
+            const data = await response.json();
+
+            feedbackToExport = feedbackToExport.concat(data.feedback);
+            cursor = data.next_cursor;
+        } while (cursor);
+    } catch (error) {
+        console.error('Error exporting feedback:', error);
+        alert('An error occurred');
+        return;
     }
 
     if (feedbackToExport.length === 0) {
@@ -368,6 +411,10 @@ document.addEventListener('DOMContentLoaded', () => {
         searchUsers(e.target.value);
     });
 
+    document.getElementById('feedback-search').addEventListener('input', (e) => {
+        searchFeedback(e.target.value);
+    });
+
     // Auto-refresh every 30 seconds
     setInterval(() => {
         loadStats();
@@ -56,6 +56,10 @@ async function initializeApp() {
 
 function attachEventListeners() {
     elements.generateForm.addEventListener('submit', handleGenerate);
+    elements.customPrompt.addEventListener('input', schedulePrefetch);
+    elements.articleTitle.addEventListener('input', schedulePrefetch);
+    elements.draftLink.addEventListener('input', schedulePrefetch);
+    elements.styleSelect.addEventListener('change', schedulePrefetch);
     elements.backToInput.addEventListener('click', () => navigateToPage(1));
     elements.backToSelection.addEventListener('click', showSelectionView);
     elements.downloadBtn.addEventListener('click', handleDownload);
@@ -239,17 +243,14 @@ function updatePreviewDimensions(width, height) {
     }, 150);
 }
 
-async function handleGenerate(e) {
-    e.preventDefault();
-
+function buildGenerateRequest() {
     const customPrompt = elements.customPrompt.value.trim();
     const articleTitle = elements.articleTitle.value.trim();
     const draftLink = elements.draftLink.value.trim();
     const style = elements.styleSelect.value;
 
     if (!customPrompt && !articleTitle) {
-        alert('Please enter either a custom prompt or an article title.');
-        return;
+        return null;
     }
 
     const requestData = {
@@ -266,6 +267,60 @@ async function handleGenerate(e) {
         requestData.draft_link = draftLink;
     }
 
+    return requestData;
+}
+
+// Speculative generation: once the input has been stable for a few seconds,
+// hint the server so it can start generating before the user clicks.
+const PREFETCH_DELAY_MS = 3000;
+const PREFETCH_MIN_TITLE_LENGTH = 8;
+let prefetchTimer = null;
+let lastPrefetch = null;
+
+function schedulePrefetch() {
+    if (elements.generateForm.dataset.prefetch !== 'true') return;
+
+    clearTimeout(prefetchTimer);
+    prefetchTimer = setTimeout(sendPrefetchHint, PREFETCH_DELAY_MS);
+}
+
+async function sendPrefetchHint() {
+    const requestData = buildGenerateRequest();
+    if (!requestData || requestData.title.length < PREFETCH_MIN_TITLE_LENGTH) return;
+
+    const body = JSON.stringify(requestData);
+    if (body === lastPrefetch) return;
+    lastPrefetch = body;
+
+    try {
+        const response = await fetch('/api/generate/prefetch', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: body
+        });
+
+        // At the speculation cap; try again after the next edit
+        if (response.status === 429) {
+            lastPrefetch = null;
+        }
+    } catch (error) {
+        lastPrefetch = null;
+    }
+}
+
+async function handleGenerate(e) {
+    e.preventDefault();
+    clearTimeout(prefetchTimer);
+
+    const requestData = buildGenerateRequest();
+
+    if (!requestData) {
+        alert('Please enter either a custom prompt or an article title.');
+        return;
+    }
+
     setLoading(true);
 
     try {
@@ -525,7 +580,9 @@ async function handleDownload() {
         payload.custom_dims = { width, height };
     }
 
+    // An explicit null clears an overlay saved on the generation earlier
     const overlayText = elements.overlayText.value;
+    payload.text_overlay = null;
     if (overlayText.trim()) {
         payload.text_overlay = {
             text: overlayText,
@@ -75,12 +75,214 @@ async function confirmDelete() {
     }
 }
 
+// Infinite Scroll Gallery
+const FALLBACK_IMAGE = 'data:image/svg+xml,%3Csvg xmlns=%22http://www.w3.org/2000/svg%22 width=%22400%22 height=%22300%22%3E%3Crect fill=%22%23f3f4f6%22 width=%22400%22 height=%22300%22/%3E%3Ctext fill=%22%23666%22 x=%2250%25%22 y=%2250%25%22 text-anchor=%22middle%22 dy=%22.3em%22%3EImage not available%3C/text%3E%3C/svg%3E';
+
+const DELETE_ICON = `<svg width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+    <path d="M3 6h18M19 6v14a2 2 0 01-2 2H7a2 2 0 01-2-2V6m3 0V4a2 2 0 012-2h4a2 2 0 012 2v2"/>
+    <line x1="10" y1="11" x2="10" y2="17"/>
+    <line x1="14" y1="11" x2="14" y2="17"/>
+</svg>`;
+
+const DOWNLOAD_ICON = `<svg width="16" height="16" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+    <path d="M21 15v4a2 2 0 01-2 2H5a2 2 0 01-2-2v-4M7 10l5 5 5-5M12 15V3"/>
+</svg>`;
+
+let galleryLoading = false;
+
+function createGenerationCard(generation) {
+    const card = document.createElement('div');
+    card.className = 'generation-card-modern';
+    card.dataset.generationId = generation.generation_id;
+
+    const header = document.createElement('div');
+    header.className = 'card-header-modern';
+
+    const title = document.createElement('h3');
+    title.className = 'card-title-modern';
+    title.title = generation.title;
+    title.textContent = generation.title;
+
+    const deleteBtn = document.createElement('button');
+    deleteBtn.className = 'btn-delete-modern';
+    deleteBtn.title = 'Delete generation';
+    deleteBtn.innerHTML = DELETE_ICON;
+    deleteBtn.addEventListener('click', () => deleteGeneration(generation.generation_id, generation.title));
+
+    header.appendChild(title);
+    header.appendChild(deleteBtn);
+    card.appendChild(header);
+
+    const imageWrapper = document.createElement('div');
+    imageWrapper.className = 'card-single-image';
+
+    if (generation.image_url) {
+        const img = document.createElement('img');
+        img.src = generation.thumbnail_url || generation.image_url;
+        img.alt = generation.title;
+        img.loading = 'lazy';
+        img.onerror = () => { img.src = FALLBACK_IMAGE; };
+
+        const overlay = document.createElement('div');
+        overlay.className = 'image-overlay';
+        overlay.innerHTML = '<span class="overlay-icon">🔍</span>';
+
+        imageWrapper.appendChild(img);
+        imageWrapper.appendChild(overlay);
+        imageWrapper.addEventListener('click', () => openImageModal(generation.image_url));
+    } else {
+        imageWrapper.classList.add('image-error');
+        imageWrapper.innerHTML = '<div class="image-placeholder"><span>Image unavailable</span></div>';
+    }
+    card.appendChild(imageWrapper);
+
+    const footer = document.createElement('div');
+    footer.className = 'card-footer-modern';
+
+    const meta = document.createElement('div');
+    meta.className = 'card-meta';
+
+    const badge = document.createElement('span');
+    badge.className = 'style-badge';
+    badge.textContent = generation.style;
+
+    const divider = document.createElement('span');
+    divider.className = 'meta-divider';
+    divider.textContent = '•';
+
+    const date = document.createElement('span');
+    date.className = 'meta-text';
+    date.textContent = new Date(generation.created_at).toLocaleDateString('en-US', {
+        month: 'short', day: '2-digit', year: 'numeric'
+    });
+
+    meta.appendChild(badge);
+    meta.appendChild(divider);
+    meta.appendChild(date);
+
+    const downloadBtn = document.createElement('button');
+    downloadBtn.type = 'button';
+    downloadBtn.className = 'btn-download-card';
+    downloadBtn.title = 'Download image';
+    downloadBtn.innerHTML = DOWNLOAD_ICON;
+    downloadBtn.addEventListener('click', () => downloadFromDashboard(generation.generation_id, 0, generation.title));
+
+    footer.appendChild(meta);
+    footer.appendChild(downloadBtn);
+    card.appendChild(footer);
+
+    return card;
+}
+
+let gallerySearchQuery = '';
+let gallerySearchTimer = null;
+let galleryObserver = null;
+
+function galleryUrl(cursor) {
+    const params = new URLSearchParams();
+    if (cursor) params.set('cursor', cursor);
+    if (gallerySearchQuery) params.set('q', gallerySearchQuery);
+    return `/api/gallery?${params}`;
+}
+
+async function loadMoreGenerations(grid, observer) {
+    const cursor = grid.dataset.nextCursor;
+    if (!cursor || galleryLoading) return;
+
+    galleryLoading = true;
+
+    try {
+        const response = await fetch(galleryUrl(cursor));
+        const data = await response.json();
+
+        if (!response.ok) {
+            console.error('Error loading generations:', data.error);
+            return;
+        }
+
+        data.generations.forEach(generation => {
+            grid.appendChild(createGenerationCard(generation));
+        });
+
+        grid.dataset.nextCursor = data.next_cursor || '';
+        if (!data.next_cursor) {
+            observer.disconnect();
+        }
+    } catch (error) {
+        console.error('Error loading generations:', error);
+    } finally {
+        galleryLoading = false;
+    }
+}
+
+async function searchGallery(grid) {
+    galleryLoading = true;
+
+    try {
+        const response = await fetch(galleryUrl(null));
+        const data = await response.json();
+
+        if (!response.ok) {
+            console.error('Error searching generations:', data.error);
+            return;
+        }
+
+        grid.replaceChildren(...data.generations.map(createGenerationCard));
+        grid.dataset.nextCursor = data.next_cursor || '';
+        grid.classList.toggle('no-results', data.generations.length === 0);
+    } catch (error) {
+        console.error('Error searching generations:', error);
+    } finally {
+        galleryLoading = false;
+    }
+
+    galleryObserver.disconnect();
+    if (grid.dataset.nextCursor) {
+        galleryObserver.observe(document.getElementById('gallery-sentinel'));
+    }
+}
+
+function initGallerySearch() {
+    const input = document.getElementById('gallery-search');
+    const grid = document.getElementById('generations-grid');
+    if (!input || !grid) return;
+
+    input.addEventListener('input', () => {
+        clearTimeout(gallerySearchTimer);
+
+        // Debounce so each keystroke doesn't hit the server
+        gallerySearchTimer = setTimeout(() => {
+            gallerySearchQuery = input.value.trim();
+            searchGallery(grid);
+        }, 300);
+    });
+}
+
+function initInfiniteScroll() {
+    const grid = document.getElementById('generations-grid');
+    const sentinel = document.getElementById('gallery-sentinel');
+    if (!grid || !sentinel) return;
+
+    galleryObserver = new IntersectionObserver((entries) => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadMoreGenerations(grid, galleryObserver);
+        }
+    }, { rootMargin: '600px 0px' });
+
+    if (grid.dataset.nextCursor) {
+        galleryObserver.observe(sentinel);
+    }
+}
+
 // Initialize on DOM load
 document.addEventListener('DOMContentLoaded', () => {
     const confirmBtn = document.getElementById('confirm-delete-btn');
     if (confirmBtn) {
         confirmBtn.addEventListener('click', confirmDelete);
     }
+
+    initInfiniteScroll();
+    initGallerySearch();
 });
 
 // Download from dashboard
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The app is a flat set of modules and tools/ holds scripts, not packages
+for path in (ROOT, os.path.join(ROOT, "tools")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    """In-memory stand-in for GCS, installed as the app's storage."""
+    import routes
+    from utils.storage import GCSStorage
+
+    class MemoryStorage(GCSStorage):
+        def __init__(self):
+            self.objects = {}
+
+        def upload_content(self, image_bytes, digest=None, ext="png"):
+            path = self.content_path(digest or self.content_digest(image_bytes), ext)
+            self.objects.setdefault(path, image_bytes)
+            return path
+
+        def delete_image(self, storage_path):
+            del self.objects[storage_path]
+
+    memory = MemoryStorage()
+    monkeypatch.setattr(routes, "_storage", memory)
+    return memory
+
+
+@pytest.fixture
+def fail_commit(monkeypatch):
+    """Call with n to make the nth following db.session.commit() raise."""
+    from models import db
+
+    def arm(n=1):
+        commit = db.session.commit
+        calls = []
+
+        def flaky(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == n:
+                raise RuntimeError("database went away")
+            return commit(*args, **kwargs)
+
+        monkeypatch.setattr(db.session, "commit", flaky)
+
+    return arm
@@ -0,0 +1,125 @@
+import uuid
+import threading
+
+import pytest
+
+import gemini_stub
+from config import Config
+from utils.metrics import MOCK_FALLBACKS
+
+
+@pytest.fixture(scope="module")
+def gemini():
+    """The Gemini stand-in on a free local port, answering at once."""
+    server = gemini_stub.build_server(port=0, image_size=(64, 36), image_variants=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, gemini, storage):
+    import bulk
+    from app import create_app
+    from models import db, User
+
+    monkeypatch.setenv("MOCK_MODE", "false")
+    monkeypatch.setenv("GOOGLE_API_KEY", "stub")
+    monkeypatch.setenv("GOOGLE_API_BASE_URL", f"http://127.0.0.1:{gemini.server_address[1]}")
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path}/bulk.db")
+    monkeypatch.setattr(Config, "DRAFT_FETCH_ENABLED", False)
+    monkeypatch.setattr(bulk, "schedule_variants", lambda image, original: None)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username="writer", email="writer@example.com")
+        user.set_password("password")
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def create_job(titles):
+    from models import db, User, BulkJob, BulkJobItem
+
+    user = User.query.filter_by(username="writer").one()
+    job = BulkJob(id=str(uuid.uuid4()), user_id=user.id)
+    db.session.add(job)
+    db.session.add_all(
+        BulkJobItem(job_id=job.id, position=position, title=title, style="Tech")
+        for position, title in enumerate(titles)
+    )
+    db.session.commit()
+    return job.id
+
+
+def fallbacks():
+    return MOCK_FALLBACKS.labels(reason="model_error")._value.get()
+
+
+def test_consecutive_jobs_use_the_model(app, gemini):
+    import bulk
+    from models import db, BulkJob, BulkJobItem
+
+    before_fallbacks = fallbacks()
+    before_requests = gemini.state.snapshot()["requests"]
+
+    for titles in (["First batch post", "Another post"], ["Second batch post", "One more"]):
+        job_id = create_job(titles)
+        bulk.run_job(job_id)
+        db.session.expire_all()
+
+        assert db.session.get(BulkJob, job_id).status == "completed"
+        assert {item.status for item in BulkJobItem.query.filter_by(job_id=job_id)} == {"done"}
+
+    assert fallbacks() == before_fallbacks
+    assert gemini.state.snapshot()["requests"] == before_requests + 4
+
+
+def test_model_errors_fail_items_for_resume(app, gemini, monkeypatch):
+    import bulk
+    from models import db, BulkJob, BulkJobItem
+
+    job_id = create_job(["Unlucky post"])
+    before_fallbacks = fallbacks()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(gemini.state, "error_rate", 1.0)
+        patch.setattr(gemini.state, "error_statuses", [400])
+        bulk.run_job(job_id)
+
+    db.session.expire_all()
+    item = BulkJobItem.query.filter_by(job_id=job_id).one()
+    assert db.session.get(BulkJob, job_id).status == "failed"
+    assert item.status == "failed"
+    assert item.generation_id is None
+    assert fallbacks() == before_fallbacks
+
+    # What resume does once the model is back
+    item.status = "pending"
+    db.session.commit()
+    bulk.run_job(job_id)
+
+    db.session.expire_all()
+    assert db.session.get(BulkJob, job_id).status == "completed"
+    assert BulkJobItem.query.filter_by(job_id=job_id).one().status == "done"
+
+
+def test_failed_item_save_discards_upload(app, storage, fail_commit):
+    import bulk
+    from models import db, BulkJobItem, StoredObject
+
+    job_id = create_job(["Doomed post"])
+    item = BulkJobItem.query.filter_by(job_id=job_id).one()
+
+    fail_commit()
+    bulk.save_item(job_id, item.id, b"cover bytes", None)
+
+    db.session.expire_all()
+    assert BulkJobItem.query.filter_by(job_id=job_id).one().status == "failed"
+    assert storage.objects == {}
+    assert StoredObject.query.count() == 0
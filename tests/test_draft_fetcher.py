@@ -0,0 +1,182 @@
+import time
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import draft_stub
+from config import Config
+from utils import draft_fetcher as fetcher_module
+from utils.draft_fetcher import DraftFetcher, DraftFetchError, check_url
+
+
+@pytest.fixture(scope="module")
+def stub():
+    """The draft stub server on a free local port, with fast misbehaving paths."""
+    draft_stub.DraftHandler.options = argparse.Namespace(slow=3.0, huge_mb=5, drip=0.2)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), draft_stub.DraftHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def draft_config(monkeypatch):
+    monkeypatch.setattr(Config, "DRAFT_FETCH_ALLOW_PRIVATE", True)
+    monkeypatch.setattr(Config, "DRAFT_FETCH_TIMEOUT", 1.0)
+    monkeypatch.setattr(Config, "DRAFT_FETCH_MAX_BYTES", 64 * 1024)
+
+
+def stub_stats():
+    with draft_stub.stats_lock:
+        return dict(draft_stub.stats)
+
+
+def test_summary_is_served_from_cache(stub):
+    fetcher = DraftFetcher(ttl=60)
+    before = stub_stats()
+
+    first = fetcher.summary(f"{stub}/posts/postgres-vacuum")
+    second = fetcher.summary(f"{stub}/posts/postgres-vacuum")
+
+    assert "Postgres Vacuum" in first
+    assert "Sections:" in first
+    assert second == first
+    assert stub_stats()["requests"] == before["requests"] + 1
+
+
+def test_expired_summary_is_revalidated_with_304(stub):
+    fetcher = DraftFetcher(ttl=0)
+    url = f"{stub}/posts/query-planning"
+    before = stub_stats()
+
+    first = fetcher.summary(url)
+    second = fetcher.summary(url)
+
+    after = stub_stats()
+    assert second == first
+    assert after["ok"] == before["ok"] + 1
+    assert after["not_modified"] == before["not_modified"] + 1
+
+
+def test_changed_draft_is_fetched_again(stub):
+    import requests
+
+    fetcher = DraftFetcher(ttl=0)
+    url = f"{stub}/posts/index-bloat"
+    fetcher.summary(url)
+    requests.post(f"{stub}/touch/posts/index-bloat", timeout=2)
+    before = stub_stats()
+
+    fetcher.summary(url)
+
+    assert stub_stats()["ok"] == before["ok"] + 1
+
+
+def test_body_is_capped_at_max_bytes(stub, monkeypatch):
+    sizes = []
+    decode_body = fetcher_module.decode_body
+
+    def record(body, content_type_header):
+        sizes.append(len(body))
+        return decode_body(body, content_type_header)
+
+    monkeypatch.setattr(fetcher_module, "decode_body", record)
+
+    start = time.monotonic()
+    summary = DraftFetcher().summary(f"{stub}/huge/posts/giant")
+
+    assert summary is not None
+    assert sizes == [Config.DRAFT_FETCH_MAX_BYTES]
+    assert time.monotonic() - start < Config.DRAFT_FETCH_TIMEOUT
+
+
+@pytest.mark.parametrize("path", ["/slow/posts/late", "/drip/posts/trickle"])
+def test_fetch_gives_up_at_the_deadline(stub, path):
+    fetcher = DraftFetcher()
+
+    start = time.monotonic()
+    summary = fetcher.summary(f"{stub}{path}")
+    elapsed = time.monotonic() - start
+
+    assert summary is None
+    assert elapsed < Config.DRAFT_FETCH_TIMEOUT + 0.5
+
+
+def test_redirects_are_followed_up_to_the_limit(stub, caplog):
+    fetcher = DraftFetcher()
+    hops = "/redirect" * fetcher_module.MAX_REDIRECTS
+
+    assert fetcher.summary(f"{stub}{hops}/posts/moved") is not None
+
+    with caplog.at_level(logging.WARNING, logger="utils.draft_fetcher"):
+        assert fetcher.summary(f"{stub}/redirect{hops}/posts/moved") is None
+    assert "Too many redirects" in caplog.text
+
+
+def test_private_addresses_are_refused(stub, monkeypatch):
+    monkeypatch.setattr(Config, "DRAFT_FETCH_ALLOW_PRIVATE", False)
+    before = stub_stats()
+
+    with pytest.raises(DraftFetchError, match="non-public"):
+        check_url(f"{stub}/posts/internal")
+    assert DraftFetcher().summary(f"{stub}/posts/internal") is None
+    assert stub_stats()["requests"] == before["requests"]
+
+
+def test_unsupported_schemes_are_refused():
+    with pytest.raises(DraftFetchError, match="Unsupported"):
+        check_url("file:///etc/passwd")
+
+
+def test_errors_are_cached_for_error_ttl(stub):
+    fetcher = DraftFetcher(error_ttl=60)
+    before = stub_stats()
+
+    assert fetcher.summary(f"{stub}/missing/posts/gone") is None
+    assert fetcher.summary(f"{stub}/missing/posts/gone") is None
+
+    assert stub_stats()["requests"] == before["requests"] + 1
+
+
+def test_binary_content_is_refused(stub):
+    assert DraftFetcher().summary(f"{stub}/binary/posts/blob") is None
+
+
+def test_utf8_without_charset_is_not_decoded_as_latin1(stub):
+    summary = DraftFetcher().summary(f"{stub}/nocharset/posts/caf%C3%A9-culture")
+
+    assert "café culture" in summary
+    assert "cafÃ©" not in summary
+
+
+def test_decode_body_uses_declared_charset():
+    body = "Prévisions".encode("latin-1")
+
+    assert fetcher_module.decode_body(body, "text/html; charset=ISO-8859-1") == "Prévisions"
+
+
+def test_decode_body_tolerates_truncated_utf8():
+    body = "naïve café".encode("utf-8")[:-1]
+
+    assert fetcher_module.decode_body(body, "text/html") == "naïve caf"
+
+
+def test_build_prompt_ignores_fetch_failures(monkeypatch):
+    from utils.image_generator import NanoBananaClient
+
+    def broken(url):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setenv("MOCK_MODE", "true")
+    monkeypatch.setattr(Config, "DRAFT_FETCH_ENABLED", True)
+    monkeypatch.setattr(fetcher_module.draft_fetcher, "summary", broken)
+
+    prompt = NanoBananaClient()._build_prompt("Scaling Postgres", "Tech", "https://example.com/d")
+
+    assert "Scaling Postgres" in prompt
@@ -0,0 +1,100 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from config import Config
+from utils import schema
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    from app import create_app
+    from models import db
+
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path}/old.db")
+
+    app = create_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+def downgrade(db):
+    """Turn a fresh database into one created before the ADDED_COLUMNS existed."""
+    db.create_all()
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table, column in schema.ADDED_COLUMNS:
+            for index in inspector.get_indexes(table):
+                if column in index["column_names"]:
+                    conn.execute(text(f"DROP INDEX {index['name']}"))
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {column}"))
+
+
+def columns(db, table):
+    return {info["name"] for info in inspect(db.engine).get_columns(table)}
+
+
+def test_upgrade_adds_missing_columns(app):
+    from models import db, User, Generation, GeneratedImage
+
+    downgrade(db)
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (username, email, password_hash, is_admin) "
+            "VALUES ('old', 'old@example.com', 'x', 0)"
+        ))
+
+    added = schema.upgrade_schema()
+
+    assert sorted(added) == sorted(
+        [f"{table}.{column}" for table, column in schema.ADDED_COLUMNS]
+        + [name for _, name in schema.ADDED_INDEXES]
+    )
+    for table, column in schema.ADDED_COLUMNS:
+        assert column in columns(db, table)
+    for table, name in schema.ADDED_INDEXES:
+        assert name in {info["name"] for info in inspect(db.engine).get_indexes(table)}
+
+    # Existing rows and the models work against the upgraded tables
+    assert User.query.filter_by(username="old").one().generation_count == 0
+    assert Generation.query.count() == 0
+    assert GeneratedImage.query.count() == 0
+
+
+def test_upgrade_is_idempotent(app):
+    from models import db
+
+    db.create_all()
+
+    assert schema.upgrade_schema() == []
+    assert schema.upgrade_schema() == []
+
+
+def test_upgrade_schema_command(app):
+    from models import db
+
+    downgrade(db)
+
+    result = app.test_cli_runner().invoke(args=["upgrade-schema"])
+
+    assert result.exit_code == 0
+    assert "Schema up to date" in result.output
+    for table, column in schema.ADDED_COLUMNS:
+        assert column in columns(db, table)
+
+
+def test_backfill_command_upgrades_first(app):
+    from models import db, User
+
+    downgrade(db)
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (username, email, password_hash, is_admin) "
+            "VALUES ('old', 'old@example.com', 'x', 0)"
+        ))
+
+    result = app.test_cli_runner().invoke(args=["backfill-user-counters"])
+
+    assert result.exit_code == 0, result.output
+    assert "Updated usage counters for 1 users" in result.output
+    assert User.query.one().image_count == 0
@@ -0,0 +1,23 @@
+import startup_budget
+
+
+def test_cold_start_within_budget():
+    result = startup_budget.measure(repeat=3)
+    failures = startup_budget.check(
+        result,
+        startup_budget.env_budget("STARTUP_IMPORT_BUDGET_MS", startup_budget.IMPORT_BUDGET_MS),
+        startup_budget.env_budget("STARTUP_BUDGET_MS", startup_budget.STARTUP_BUDGET_MS),
+    )
+    assert not failures, "\n".join(failures)
+
+
+def test_check_reports_each_violation():
+    result = {"import_ms": 900, "startup_ms": 1500, "heavy_modules": ["google.genai"]}
+
+    failures = startup_budget.check(result, import_budget=1000, startup_budget=1200)
+
+    assert failures == [
+        "startup took 1500ms, budget 1200ms",
+        "google.genai was imported before any request needed it",
+    ]
+    assert startup_budget.check(result, None, None) == failures[1:]
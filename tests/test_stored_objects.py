@@ -0,0 +1,83 @@
+import pytest
+
+from config import Config
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, storage):
+    import routes
+    from app import create_app
+    from models import db, User
+
+    monkeypatch.setenv("MOCK_MODE", "true")
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path}/refs.db")
+    monkeypatch.setattr(routes, "schedule_variants", lambda image, original: None)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(username="writer", email="writer@example.com")
+        user.set_password("password")
+        db.session.add(user)
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+def generate(client):
+    response = client.post("/api/generate", json={"title": "Shared covers", "style": "Tech"})
+    assert response.status_code == 200
+    return response.json["generation_id"]
+
+
+def assert_nothing_stored(storage):
+    from models import StoredObject
+
+    assert storage.objects == {}
+    assert StoredObject.query.count() == 0
+
+
+def test_failed_save_selection_discards_upload(app, storage, fail_commit):
+    client = app.test_client()
+    client.post("/login", json={"username": "writer", "password": "password"})
+    generation_id = generate(client)
+    fail_commit()
+
+    response = client.post(
+        "/api/save-selection", json={"generation_id": generation_id, "selected_index": 0}
+    )
+
+    assert response.status_code == 500
+    assert_nothing_stored(storage)
+
+
+def test_failed_signup_save_discards_upload(app, storage, fail_commit):
+    client = app.test_client()
+    generation_id = generate(client)
+    client.post("/api/update-selection", json={"generation_id": generation_id, "selected_index": 0})
+    # The first commit creates the account, the second saves the pending cover
+    fail_commit(2)
+
+    response = client.post(
+        "/signup",
+        json={"username": "newcomer", "email": "new@example.com", "password": "password"},
+    )
+
+    assert response.status_code == 200
+    assert_nothing_stored(storage)
+
+
+def test_save_selection_keeps_committed_upload(app, storage):
+    from models import StoredObject
+
+    client = app.test_client()
+    client.post("/login", json={"username": "writer", "password": "password"})
+    generation_id = generate(client)
+
+    response = client.post(
+        "/api/save-selection", json={"generation_id": generation_id, "selected_index": 0}
+    )
+
+    assert response.status_code == 200
+    assert len(storage.objects) == 1
+    assert StoredObject.query.one().ref_count == 1
@@ -0,0 +1,288 @@
+"""
+Benchmarks for ImageProcessor and the mock image generator.
+
+Cases sweep every platform preset and a range of custom sizes across source
+resolutions, short and long overlay text in every font, text wrapping on its
+own, and mock generation. Each case records median wall time, peak memory
+above the starting RSS (measured in a fresh child process, Linux only) and
+output size in bytes.
+
+    python tools/benchmark.py --save-baseline tools/benchmark_baseline.json
+    python tools/benchmark.py --compare tools/benchmark_baseline.json
+
+With --compare, the run exits 1 if any case is slower, larger in memory or
+larger in output than the baseline by more than the given tolerances.
+Baselines are machine-specific; save them on the machine that compares.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import tempfile
+import statistics
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from utils.image_processor import ImageProcessor  # noqa: E402
+from utils.image_generator import NanoBananaClient  # noqa: E402
+
+SOURCE_RESOLUTIONS = [(1024, 576), (1600, 900), (2048, 1152)]
+CUSTOM_SIZES = [(400, 400), (1200, 630), (2400, 1260), (3840, 2160)]
+
+SHORT_TEXT = "Ship It Faster"
+LONG_TEXT = (
+    "A Practical Guide to Profiling Python Web Services Under Load, "
+    "From Flame Graphs to Allocation Tracking and Everything In Between\n"
+    "Part Two: Images, Fonts and the Cost of Re-encoding"
+)
+
+
+_sources = {}
+
+
+def make_source(width, height):
+    """Render a photo-like PNG (gradient plus noise) at the given size."""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 32)
+    img = Image.merge("RGB", (gradient, noise, gradient.rotate(180)))
+
+    output = io.BytesIO()
+    img.save(output, format="PNG")
+    return output.getvalue()
+
+
+def source(width, height):
+    """Source PNG for a resolution, rendered once per process."""
+    if (width, height) not in _sources:
+        _sources[(width, height)] = make_source(width, height)
+    return _sources[(width, height)]
+
+
+def overlay(text, font="Inter", size=48):
+    return {
+        "text": text,
+        "font": font,
+        "size": size,
+        "color": "#FFFFFF",
+        "position": "bottom-center",
+        "shadow": True,
+    }
+
+
+def build_cases():
+    """Return an ordered dict of case name -> zero-argument callable returning bytes."""
+    cases = {}
+
+    for sw, sh in SOURCE_RESOLUTIONS:
+        for platform in ImageProcessor.PLATFORM_DIMENSIONS:
+            cases[f"resize/{sw}x{sh}/{platform}"] = (
+                lambda r=(sw, sh), p=platform: ImageProcessor.process_image(source(*r), p)
+            )
+        for cw, ch in CUSTOM_SIZES:
+            dims = {"width": cw, "height": ch}
+            cases[f"resize/{sw}x{sh}/custom-{cw}x{ch}"] = (
+                lambda r=(sw, sh), c=dims: ImageProcessor.process_image(
+                    source(*r), "Custom", c
+                )
+            )
+
+    for font in ImageProcessor.FONT_PATHS:
+        for label, text in (("short", SHORT_TEXT), ("long", LONG_TEXT)):
+            cases[f"overlay/{font}/{label}"] = (
+                lambda f=font, t=text: ImageProcessor.process_image(
+                    source(1600, 900), "Hashnode", text_overlay=overlay(t, f)
+                )
+            )
+        cases[f"overlay-only/{font}/long"] = (
+            lambda f=font: ImageProcessor.process_image(
+                source(1600, 900), None, text_overlay=overlay(LONG_TEXT, f)
+            )
+        )
+
+    canvas = Image.new("RGB", (1600, 840))
+    draw = ImageDraw.Draw(canvas)
+    for font in ImageProcessor.FONT_PATHS:
+        loaded = load_font(font, 48)
+        for label, text in (("short", SHORT_TEXT), ("long", LONG_TEXT)):
+            cases[f"wrap/{font}/{label}"] = (
+                lambda fo=loaded, t=text: "\n".join(
+                    ImageProcessor._wrap_text(t, fo, 1440, draw)
+                ).encode("utf-8")
+            )
+
+    generator = NanoBananaClient.__new__(NanoBananaClient)
+    for count in (1, 2, 4):
+        cases[f"mock/{count}"] = (
+            lambda n=count: b"".join(generator._generate_mock_images(n))
+        )
+
+    return cases
+
+
+def load_font(name, size):
+    for path in ImageProcessor.FONT_PATHS[name]:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def read_status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _measure_peak(name, source_dir, conn):
+    for filename in os.listdir(source_dir):
+        width, height = (int(v) for v in filename[:-4].split("x"))
+        with open(os.path.join(source_dir, filename), "rb") as f:
+            _sources[(width, height)] = f.read()
+
+    fn = build_cases()[name]
+
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+
+    start = read_status_kb("VmRSS")
+    fn()
+    conn.send(max(0, read_status_kb("VmHWM") - start))
+    conn.close()
+
+
+def peak_memory_kb(name, source_dir):
+    """
+    Peak RSS growth while running one case in a fresh interpreter.
+
+    A clean process with a fixed mmap threshold keeps freed image buffers
+    from earlier cases from being silently reused, so the number reflects
+    what this case needs. Returns None where /proc is unavailable.
+    """
+    if not os.path.exists("/proc/self/clear_refs"):
+        return None
+
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_measure_peak, args=(name, source_dir, child))
+    process.start()
+    child.close()
+    try:
+        return parent.recv()
+    except EOFError:
+        return None
+    finally:
+        process.join()
+
+
+def run_case(name, fn, repeat, source_dir):
+    output = fn()  # warm-up: font loading, decoder setup
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "time_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "peak_kb": peak_memory_kb(name, source_dir),
+        "bytes": len(output),
+    }
+
+
+def compare(results, baseline, time_tolerance, memory_tolerance, size_tolerance):
+    """Return regression messages for cases that got worse than baseline."""
+    regressions = []
+    checks = (
+        ("time_ms", time_tolerance, "ms"),
+        ("peak_kb", memory_tolerance, "KiB"),
+        ("bytes", size_tolerance, "B"),
+    )
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key, tolerance, unit in checks:
+            old, new = base.get(key), result.get(key)
+            if not old or new is None:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {key} {old:.1f}{unit} -> {new:.1f}{unit} "
+                    f"(+{(new / old - 1):.0%}, tolerance {tolerance:.0%})"
+                )
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="Only run cases whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--save-baseline", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against this baseline JSON file")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--memory-tolerance", type=float, default=0.20)
+    parser.add_argument("--size-tolerance", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    cases = build_cases()
+    if args.filter:
+        cases = {name: fn for name, fn in cases.items() if args.filter in name}
+
+    # Spawned memory probes read the same sources from disk and hand large
+    # allocations straight back to the OS when freed
+    os.environ["MALLOC_MMAP_THRESHOLD_"] = "131072"
+    source_dir = tempfile.mkdtemp(prefix="cover-bench-")
+    for width, height in SOURCE_RESOLUTIONS:
+        with open(os.path.join(source_dir, f"{width}x{height}.png"), "wb") as f:
+            f.write(source(width, height))
+
+    results = {}
+    print(f"{'case':<48}{'median ms':>12}{'min ms':>10}{'peak KiB':>12}{'bytes':>12}")
+    try:
+        for name, fn in cases.items():
+            result = run_case(name, fn, args.repeat, source_dir)
+            results[name] = result
+            peak = "-" if result["peak_kb"] is None else str(result["peak_kb"])
+            print(
+                f"{name:<48}{result['time_ms']:>12.1f}{result['min_ms']:>10.1f}"
+                f"{peak:>12}{result['bytes']:>12}"
+            )
+    finally:
+        shutil.rmtree(source_dir, ignore_errors=True)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(
+            results, baseline, args.time_tolerance, args.memory_tolerance, args.size_tolerance
+        )
+        if regressions:
+            print("\nREGRESSIONS:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+
+        print("\nNo regressions against baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
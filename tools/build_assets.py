@@ -0,0 +1,123 @@
+"""
+Static asset build: content-hashed filenames plus gzip and brotli copies.
+
+Copies every file under static/ (except static/dist itself) to
+static/dist/<dir>/<name>.<hash>.<ext>, writes .gz and .br siblings for
+compressible types, and records the mapping in static/dist/manifest.json:
+
+    {"css/style.css": "dist/css/style.3f2a9c1b.css", ...}
+
+Templates resolve paths through that manifest with asset_url(), so a
+changed file gets a new URL and unchanged files stay cached forever.
+
+    python tools/build_assets.py            # build into static/dist
+    python tools/build_assets.py --clean    # remove static/dist first
+
+Brotli copies need the `brotli` package; without it only gzip is written.
+"""
+import os
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import argparse
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIC = os.path.join(ROOT, "static")
+DIST = os.path.join(STATIC, "dist")
+
+# Already-compressed formats gain nothing from another pass
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html", ".map")
+
+HASH_LENGTH = 8
+
+
+def iter_sources():
+    """Yield static-relative paths of every source asset."""
+    for directory, dirnames, filenames in os.walk(STATIC):
+        if os.path.abspath(directory) == DIST:
+            dirnames[:] = []
+            continue
+        dirnames[:] = [d for d in dirnames if os.path.join(directory, d) != DIST]
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, STATIC).replace(os.sep, "/")
+
+
+def fingerprinted_name(relpath, data):
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    stem, ext = os.path.splitext(relpath)
+    return f"{stem}.{digest}{ext}"
+
+
+def write_compressed(path, data):
+    """Write .gz and .br siblings of path; skip any that aren't smaller."""
+    written = []
+
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) < len(data):
+        with open(f"{path}.gz", "wb") as f:
+            f.write(compressed)
+        written.append("gz")
+
+    if brotli is not None:
+        compressed = brotli.compress(data, quality=11)
+        if len(compressed) < len(data):
+            with open(f"{path}.br", "wb") as f:
+                f.write(compressed)
+            written.append("br")
+
+    return written
+
+
+def build(clean=False):
+    if clean and os.path.isdir(DIST):
+        shutil.rmtree(DIST)
+
+    manifest = {}
+
+    for relpath in iter_sources():
+        with open(os.path.join(STATIC, relpath), "rb") as f:
+            data = f.read()
+
+        target = "dist/" + fingerprinted_name(relpath, data)
+        path = os.path.join(STATIC, target)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+        encodings = []
+        if relpath.endswith(COMPRESSIBLE):
+            encodings = write_compressed(path, data)
+
+        manifest[relpath] = target
+        print(f"{relpath} -> {target} {' '.join(encodings)}".rstrip())
+
+    with open(os.path.join(DIST, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    if brotli is None:
+        print("brotli not installed: wrote gzip copies only", file=sys.stderr)
+
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clean", action="store_true", help="remove static/dist before building")
+    args = parser.parse_args()
+
+    manifest = build(clean=args.clean)
+    print(f"{len(manifest)} assets written to {os.path.relpath(DIST, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
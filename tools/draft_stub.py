@@ -0,0 +1,192 @@
+"""
+Offline stand-in for blog draft pages, for exercising draft-link fetching.
+
+Serves a generated article at any path, with a stable ETag and Last-Modified
+per path, and answers If-None-Match / If-Modified-Since with 304 so cache
+revalidation can be observed. Some paths misbehave on purpose:
+
+    /slow/...        waits --slow seconds before answering
+    /drip/...        sends headers at once, then one paragraph every --drip seconds
+    /nocharset/...   the usual page, UTF-8 but with no charset in Content-Type
+    /huge/...        streams --huge-mb MiB of paragraphs
+    /redirect/...    302 to the same path without the /redirect prefix
+    /missing/...     404
+    /binary/...      application/octet-stream
+
+Usage:
+    python tools/draft_stub.py --port 8091
+
+Then start the app against it:
+    DRAFT_FETCH_ALLOW_PRIVATE=true flask --app app run
+    # and generate with draft_link=http://127.0.0.1:8091/posts/postgres-vacuum
+
+POST /touch/<path> changes a page's content (new ETag). GET /stats returns
+request, 200 and 304 counters as JSON.
+"""
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate
+from urllib.parse import unquote
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARTICLE = """<!doctype html>
+<html><head>
+<title>{title}</title>
+<meta name="description" content="{title}: a practical walkthrough of {topic}, with benchmarks and the mistakes to avoid.">
+<style>body {{ font-family: sans-serif; }}</style>
+</head><body>
+<nav><a href="/">Home</a> <a href="/about">About</a></nav>
+<h1>{title}</h1>
+<p>This draft explains {topic} from first principles, then measures what changes in production.</p>
+<h2>Why {topic} matters</h2>
+<p>Most teams meet {topic} the first time something breaks at scale.</p>
+<h2>Measuring before and after</h2>
+<p>We profile a real workload and compare the numbers.</p>
+<h2>Checklist</h2>
+<ul><li>Measure first</li><li>Change one thing at a time</li></ul>
+<footer>Revision {revision}</footer>
+</body></html>
+"""
+
+stats = {"requests": 0, "ok": 0, "not_modified": 0}
+revisions = {}
+stats_lock = threading.Lock()
+
+
+def page(path):
+    slug = unquote(path.rstrip("/").rsplit("/", 1)[-1]) or "index"
+    topic = slug.replace("-", " ")
+    revision = revisions.get(path, 0)
+    body = ARTICLE.format(title=topic.title(), topic=topic, revision=revision).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+    # Fixed per revision so If-Modified-Since can match
+    last_modified = formatdate(1_700_000_000 + revision * 3600, usegmt=True)
+    return body, etag, last_modified
+
+
+class DraftHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    options = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, content_type="text/html; charset=utf-8", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up, e.g. a fetch that hit its deadline
+            pass
+
+    def do_POST(self):
+        if self.path.startswith("/touch/"):
+            path = self.path[len("/touch"):]
+            revisions[path] = revisions.get(path, 0) + 1
+            return self.send_body(200, b"{}", "application/json")
+        self.send_body(404, b"")
+
+    def do_GET(self):
+        with stats_lock:
+            stats["requests"] += 1
+
+        if self.path == "/stats":
+            return self.send_body(200, json.dumps(stats).encode(), "application/json")
+
+        if self.path.startswith("/missing/"):
+            return self.send_body(404, b"not found")
+
+        if self.path.startswith("/binary/"):
+            return self.send_body(200, b"\x00" * 1024, "application/octet-stream")
+
+        if self.path.startswith("/redirect/"):
+            return self.send_body(302, b"", headers=[("Location", self.path[len("/redirect"):])])
+
+        if self.path.startswith("/slow/"):
+            time.sleep(self.options.slow)
+
+        if self.path.startswith("/huge/"):
+            return self.send_huge()
+
+        if self.path.startswith("/drip/"):
+            return self.send_drip()
+
+        body, etag, last_modified = page(self.path)
+        validators = [("ETag", etag), ("Last-Modified", last_modified)]
+
+        if self.headers.get("If-None-Match") == etag or (
+            "If-None-Match" not in self.headers
+            and self.headers.get("If-Modified-Since") == last_modified
+        ):
+            with stats_lock:
+                stats["not_modified"] += 1
+            self.send_response(304)
+            for name, value in validators:
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        with stats_lock:
+            stats["ok"] += 1
+        content_type = "text/html" if self.path.startswith("/nocharset/") else "text/html; charset=utf-8"
+        self.send_body(200, body, content_type, headers=validators)
+
+    def send_huge(self):
+        chunk = b"<p>" + b"filler text for an oversized draft " * 28 + b"</p>\n"
+        count = self.options.huge_mb * 1024 * 1024 // len(chunk)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(count * len(chunk)))
+        self.end_headers()
+        try:
+            for _ in range(count):
+                self.wfile.write(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+    def send_drip(self):
+        paragraph = b"<p>" + b"slowly arriving text " * 4 + b"</p>\n"
+        count = 1024
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(count * len(paragraph)))
+        self.end_headers()
+        try:
+            for _ in range(count):
+                self.wfile.write(paragraph)
+                self.wfile.flush()
+                time.sleep(self.options.drip)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in server for blog draft pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8091)
+    parser.add_argument("--slow", type=float, default=10.0, help="seconds /slow/ pages take")
+    parser.add_argument("--huge-mb", type=int, default=50, help="size of /huge/ pages")
+    parser.add_argument("--drip", type=float, default=0.5, help="seconds between /drip/ paragraphs")
+    options = parser.parse_args()
+
+    DraftHandler.options = options
+    server = ThreadingHTTPServer((options.host, options.port), DraftHandler)
+    print(f"Draft stub listening on http://{options.host}:{options.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
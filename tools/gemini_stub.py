@@ -0,0 +1,244 @@
+"""
+Offline stand-in for the Gemini generate_content endpoint.
+
+Speaks enough of the REST protocol that NanoBananaClient can't tell it apart
+from the real API, with configurable latency and failure behaviour, so the
+real network path (threads, timeouts, fallbacks) can be exercised without
+spending model quota.
+
+Usage:
+    python tools/gemini_stub.py --port 8090 --latency lognormal:1.6,0.35 --error-rate 0.02
+
+Then start the app against it:
+    GOOGLE_API_KEY=stub GOOGLE_API_BASE_URL=http://127.0.0.1:8090 MOCK_MODE=false \\
+        gunicorn -c gunicorn.conf.py app:app
+
+Latency specs (seconds):
+    fixed:S             always S
+    uniform:LO,HI       uniformly between LO and HI
+    normal:MEAN,SD      normal, clamped at zero
+    lognormal:MU,SIGMA  exp(normal(MU, SIGMA)); median is exp(MU)
+
+GET /stats returns request, error and concurrency counters as JSON.
+"""
+import io
+import re
+import sys
+import json
+import time
+import random
+import base64
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+GENERATE_PATH = re.compile(r"^/v1[^/]*/models/([^/:]+):generateContent")
+
+
+def parse_latency(spec):
+    """Turn a latency spec string into a zero-argument sampler returning seconds."""
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "normal" and len(values) == 2:
+        return lambda: max(0.0, random.gauss(values[0], values[1]))
+    if kind == "lognormal" and len(values) == 2:
+        return lambda: random.lognormvariate(values[0], values[1])
+
+    raise argparse.ArgumentTypeError(f"Invalid latency spec: {spec!r}")
+
+
+def make_images(count, width, height):
+    """Render PNGs with gradient plus noise, so they compress like real covers."""
+    images = []
+    for i in range(count):
+        gradient = Image.linear_gradient("L").resize((width, height))
+        noise = Image.effect_noise((width, height), 40 + i * 10)
+        img = Image.merge("RGB", (gradient, noise, gradient.rotate(180)))
+
+        output = io.BytesIO()
+        img.save(output, format="PNG")
+        images.append(base64.b64encode(output.getvalue()).decode("ascii"))
+    return images
+
+
+class StubState:
+    def __init__(self, latency, error_rate, error_statuses, hang_rate, hang_seconds, images):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.images = images
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.hangs = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "hangs": self.hangs,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+            }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            return self._send_json(200, self.state.snapshot())
+        return self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        match = GENERATE_PATH.match(self.path)
+        if not match:
+            return self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+        state = self.state
+        state.enter()
+        try:
+            roll = random.random()
+
+            if roll < state.hang_rate:
+                with state.lock:
+                    state.hangs += 1
+                time.sleep(state.hang_seconds)
+            else:
+                time.sleep(state.latency())
+
+            if roll < state.hang_rate + state.error_rate:
+                status = random.choice(state.error_statuses)
+                with state.lock:
+                    state.errors += 1
+                return self._send_json(
+                    status,
+                    {"error": {"code": status, "message": "Injected failure", "status": "UNAVAILABLE"}},
+                )
+
+            return self._send_json(200, self._generate_response(match.group(1)))
+        finally:
+            state.leave()
+
+    def _generate_response(self, model):
+        return {
+            "candidates": [
+                {
+                    "content": {
+                        "role": "model",
+                        "parts": [
+                            {
+                                "inlineData": {
+                                    "mimeType": "image/png",
+                                    "data": random.choice(self.state.images),
+                                }
+                            }
+                        ],
+                    },
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "modelVersion": model,
+            "usageMetadata": {"promptTokenCount": 100, "totalTokenCount": 1390},
+        }
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. its timeout fired during an injected hang)
+            pass
+
+
+def build_server(host="127.0.0.1", port=8090, latency="fixed:0", error_rate=0.0,
+                 error_statuses=(500, 503, 429), hang_rate=0.0, hang_seconds=300,
+                 image_size=(1024, 576), image_variants=3):
+    """Create (but don't start) a stand-in server; port 0 picks a free port."""
+    sampler = parse_latency(latency) if isinstance(latency, str) else latency
+    state = StubState(
+        latency=sampler,
+        error_rate=error_rate,
+        error_statuses=list(error_statuses),
+        hang_rate=hang_rate,
+        hang_seconds=hang_seconds,
+        images=make_images(image_variants, *image_size),
+    )
+
+    handler = type("BoundStubHandler", (StubHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:1.6,0.35", help="Latency spec (see above)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", default="500,503,429", help="Comma-separated statuses for failures")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests that stall")
+    parser.add_argument("--hang-seconds", type=float, default=300, help="How long a stalled request sleeps")
+    parser.add_argument("--image-size", default="1024x576", help="WIDTHxHEIGHT of returned images")
+    args = parser.parse_args(argv)
+
+    width, height = (int(v) for v in args.image_size.lower().split("x"))
+
+    server = build_server(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_statuses=[int(s) for s in args.error_status.split(",")],
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        image_size=(width, height),
+    )
+
+    print(f"Gemini stand-in listening on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
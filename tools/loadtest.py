@@ -0,0 +1,315 @@
+"""
+End-to-end load test for the generate -> save -> download flow.
+
+Each virtual user signs up once, then repeatedly generates covers, fetches
+the first preview, saves a selection and downloads it for a platform. Every
+HTTP step is timed, and the run reports throughput plus p50/p95/p99 latency
+per step. Thresholds turn the report into a pass/fail regression gate.
+
+Run the Gemini stand-in and the app first (see tools/gemini_stub.py), then:
+
+    python tools/loadtest.py --base-url http://127.0.0.1:8080 --users 50 --duration 120 \\
+        --threshold generate:p95=6000 --threshold download:p99=2500 --max-error-rate 0.01
+
+Saving and downloading saved covers need storage; point STORAGE_EMULATOR_HOST
+at a GCS emulator (e.g. fake-gcs-server) for a fully offline run, or pass
+--flows generate,preview to exercise only the model path.
+
+Exits 1 if any threshold is exceeded.
+"""
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+import http.cookiejar
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+STEPS = ("signup", "generate", "preview", "save", "download")
+DEFAULT_FLOWS = "generate,preview,save,download"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+class Recorder:
+    """Thread-safe collection of per-step latencies and failures."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.flows = 0
+
+    def record(self, step, elapsed_ms, ok):
+        with self.lock:
+            self.latencies[step].append(elapsed_ms)
+            if not ok:
+                self.errors[step] += 1
+
+    def flow_done(self):
+        with self.lock:
+            self.flows += 1
+
+    def summary(self, wall_seconds):
+        with self.lock:
+            steps = {}
+            for step in STEPS:
+                values = sorted(self.latencies.get(step, []))
+                if not values:
+                    continue
+                steps[step] = {
+                    "count": len(values),
+                    "errors": self.errors.get(step, 0),
+                    "error_rate": self.errors.get(step, 0) / len(values),
+                    "p50": percentile(values, 50),
+                    "p95": percentile(values, 95),
+                    "p99": percentile(values, 99),
+                    "max": values[-1],
+                    "rps": len(values) / wall_seconds,
+                }
+
+            total = sum(s["count"] for s in steps.values())
+            errors = sum(s["errors"] for s in steps.values())
+            return {
+                "duration_s": wall_seconds,
+                "flows": self.flows,
+                "flows_per_s": self.flows / wall_seconds,
+                "requests": total,
+                "requests_per_s": total / wall_seconds,
+                "error_rate": errors / total if total else 0.0,
+                "steps": steps,
+            }
+
+
+class VirtualUser:
+    def __init__(self, base_url, recorder, flows, platform, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.flows = flows
+        self.platform = platform
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, step, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(
+            self.base_url + path,
+            data=data,
+            method=method,
+            headers={"Content-Type": "application/json", "Accept": "image/webp,*/*"},
+        )
+
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=self.timeout) as response:
+                body = response.read()
+                ok = 200 <= response.status < 300
+                content_type = response.headers.get("Content-Type", "")
+        except urllib.error.HTTPError as e:
+            body, ok, content_type = e.read(), False, ""
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            body, ok, content_type = b"", False, ""
+
+        self.recorder.record(step, (time.perf_counter() - start) * 1000, ok)
+
+        if ok and content_type.startswith("application/json"):
+            return json.loads(body)
+        return body if ok else None
+
+    def signup(self):
+        name = f"load-{uuid.uuid4().hex[:12]}"
+        result = self.request(
+            "signup",
+            "POST",
+            "/signup",
+            {"username": name, "email": f"{name}@example.com", "password": "load-test"},
+        )
+        return result is not None
+
+    def run_flow(self, iteration):
+        generated = self.request(
+            "generate",
+            "POST",
+            "/api/generate",
+            {"title": f"Load test post {iteration}", "style": "Tech"},
+        )
+        if not generated:
+            return
+
+        generation_id = generated["generation_id"]
+
+        if "preview" in self.flows and generated.get("images"):
+            self.request("preview", "GET", generated["images"][0])
+
+        if "save" in self.flows:
+            self.request(
+                "save",
+                "POST",
+                "/api/save-selection",
+                {"generation_id": generation_id, "selected_index": 0},
+            )
+
+        if "download" in self.flows:
+            self.request(
+                "download",
+                "POST",
+                "/api/download",
+                {
+                    "generation_id": generation_id,
+                    "selected_image_index": 0,
+                    "platform": self.platform,
+                    "text_overlay": {"text": f"Load test post {iteration}"},
+                },
+            )
+
+        self.recorder.flow_done()
+
+
+def run(base_url, users, duration=None, iterations=None, flows=DEFAULT_FLOWS,
+        platform="Hashnode", timeout=300, ramp_up=0.0):
+    """
+    Drive users concurrent virtual users and return the summary dict.
+
+    Stops after duration seconds or iterations flows per user, whichever
+    is given (duration wins if both are).
+    """
+    recorder = Recorder()
+    flow_set = set(flows.split(","))
+    deadline = time.monotonic() + duration if duration else None
+
+    def worker(index):
+        if ramp_up:
+            time.sleep(ramp_up * index / max(1, users))
+
+        user = VirtualUser(base_url, recorder, flow_set, platform, timeout)
+        if not user.signup():
+            return
+
+        iteration = 0
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if deadline is None and iteration >= (iterations or 1):
+                break
+            user.run_flow(iteration)
+            iteration += 1
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return recorder.summary(time.monotonic() - start)
+
+
+def parse_threshold(spec):
+    """Parse STEP:STAT=LIMIT, e.g. generate:p95=6000 (milliseconds)."""
+    try:
+        target, limit = spec.split("=")
+        step, stat = target.split(":")
+        if step not in STEPS or stat not in ("p50", "p95", "p99", "max"):
+            raise ValueError
+        return step, stat, float(limit)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid threshold: {spec!r}")
+
+
+def check_thresholds(summary, thresholds, max_error_rate=None, min_rps=None):
+    """Return a list of human-readable threshold violations."""
+    failures = []
+
+    for step, stat, limit in thresholds:
+        observed = summary["steps"].get(step, {}).get(stat)
+        if observed is None:
+            failures.append(f"{step}:{stat} has no samples")
+        elif observed > limit:
+            failures.append(f"{step}:{stat} = {observed:.0f}ms exceeds {limit:.0f}ms")
+
+    if max_error_rate is not None and summary["error_rate"] > max_error_rate:
+        failures.append(
+            f"error rate {summary['error_rate']:.2%} exceeds {max_error_rate:.2%}"
+        )
+
+    if min_rps is not None and summary["flows_per_s"] < min_rps:
+        failures.append(
+            f"throughput {summary['flows_per_s']:.2f} flows/s below {min_rps:.2f}"
+        )
+
+    return failures
+
+
+def format_report(summary):
+    lines = [
+        f"Duration: {summary['duration_s']:.1f}s   Flows: {summary['flows']} "
+        f"({summary['flows_per_s']:.2f}/s)   Requests: {summary['requests']} "
+        f"({summary['requests_per_s']:.2f}/s)   Errors: {summary['error_rate']:.2%}",
+        "",
+        f"{'step':<10}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}",
+    ]
+    for step, s in summary["steps"].items():
+        lines.append(
+            f"{step:<10}{s['count']:>8}{s['errors']:>8}{s['p50']:>10.0f}"
+            f"{s['p95']:>10.0f}{s['p99']:>10.0f}{s['max']:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8080")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, help="Run for this many seconds")
+    parser.add_argument("--iterations", type=int, default=5, help="Flows per user when no duration is set")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which users start")
+    parser.add_argument("--flows", default=DEFAULT_FLOWS, help="Comma-separated steps after generate")
+    parser.add_argument("--platform", default="Hashnode")
+    parser.add_argument("--timeout", type=float, default=300, help="Per-request client timeout")
+    parser.add_argument("--threshold", type=parse_threshold, action="append", default=[],
+                        help="STEP:STAT=MS, e.g. generate:p95=6000 (repeatable)")
+    parser.add_argument("--max-error-rate", type=float)
+    parser.add_argument("--min-rps", type=float, help="Minimum completed flows per second")
+    parser.add_argument("--json", help="Write the summary to this file")
+    args = parser.parse_args(argv)
+
+    summary = run(
+        args.base_url,
+        args.users,
+        duration=args.duration,
+        iterations=args.iterations,
+        flows=args.flows,
+        platform=args.platform,
+        timeout=args.timeout,
+        ramp_up=args.ramp_up,
+    )
+
+    print(format_report(summary))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+    failures = check_thresholds(summary, args.threshold, args.max_error_rate, args.min_rps)
+    if failures:
+        print("\nFAILED:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Cold-start budget check: import time and time to first request.
+
+Runs each measurement in a fresh interpreter so nothing is already imported
+or cached, and repeats it to smooth out noise (the median is reported):
+
+    import    -- `import app` (should not pull in google.genai / GCS, or build the app)
+    startup   -- `import app` + create_app() + first GET /login through the test client
+
+    python tools/startup_budget.py --import-budget 1500 --startup-budget 3000
+
+Budgets are in milliseconds. They default to STARTUP_IMPORT_BUDGET_MS and
+STARTUP_BUDGET_MS from the environment, else to IMPORT_BUDGET_MS and
+STARTUP_BUDGET_MS below. The run also fails if any module in HEAVY_MODULES is
+imported before the first request that needs it. Exits 1 on any violation.
+
+tests/test_startup_budget.py runs the same check under pytest.
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# SDKs that must stay out of the import path until a request needs them
+HEAVY_MODULES = ("google.genai", "google.cloud.storage")
+
+# Last measured at ~530ms import / ~575ms first request; roughly 2x headroom
+# for slower CI machines while still catching a heavy import creeping back in
+IMPORT_BUDGET_MS = 1000
+STARTUP_BUDGET_MS = 1200
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+result = {{"import_ms": (imported - start) * 1000}}
+if {startup}:
+    client = app.app.test_client()
+    response = client.get("/login")
+    result["startup_ms"] = (time.perf_counter() - start) * 1000
+    result["status"] = response.status_code
+result["heavy"] = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps(result))
+"""
+
+
+def probe(startup):
+    """Run one measurement in a fresh interpreter and return its result dict."""
+    env = dict(os.environ)
+    env.setdefault("MOCK_MODE", "true")
+    env.setdefault("GCS_BUCKET_NAME", "startup-budget")
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env.setdefault("SECRET_KEY", "startup-budget")
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(startup=startup, heavy=HEAVY_MODULES)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(repeat):
+    imports, startups, heavy = [], [], set()
+
+    for _ in range(repeat):
+        result = probe(startup=False)
+        imports.append(result["import_ms"])
+        heavy.update(result["heavy"])
+
+        result = probe(startup=True)
+        startups.append(result["startup_ms"])
+        heavy.update(result["heavy"])
+
+    return {
+        "import_ms": statistics.median(imports),
+        "startup_ms": statistics.median(startups),
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def env_budget(name, default):
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def check(result, import_budget, startup_budget):
+    """List budget violations in a measure() result (empty when within budget)."""
+    failures = []
+    if import_budget is not None and result["import_ms"] > import_budget:
+        failures.append(f"import took {result['import_ms']:.0f}ms, budget {import_budget:.0f}ms")
+    if startup_budget is not None and result["startup_ms"] > startup_budget:
+        failures.append(f"startup took {result['startup_ms']:.0f}ms, budget {startup_budget:.0f}ms")
+    for name in result["heavy_modules"]:
+        failures.append(f"{name} was imported before any request needed it")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--import-budget", type=float, default=env_budget("STARTUP_IMPORT_BUDGET_MS", IMPORT_BUDGET_MS),
+                        help="Max median ms for `import app`")
+    parser.add_argument("--startup-budget", type=float, default=env_budget("STARTUP_BUDGET_MS", STARTUP_BUDGET_MS),
+                        help="Max median ms from interpreter start of import to first response")
+    args = parser.parse_args(argv)
+
+    try:
+        result = measure(args.repeat)
+    except subprocess.CalledProcessError as e:
+        print(e.stderr, file=sys.stderr)
+        return 1
+
+    print(f"import app:          {result['import_ms']:8.0f} ms")
+    print(f"first request ready: {result['startup_ms']:8.0f} ms")
+
+    failures = check(result, args.import_budget, args.startup_budget)
+    if failures:
+        print("\nFAILED:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import os
+import json
+import logging
+import mimetypes
+
+from flask import request, send_from_directory, url_for
+
+logger = logging.getLogger(__name__)
+
+# Fingerprinted URLs change with their content, so they can be cached forever
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# Precompressed siblings written by tools/build_assets.py, best first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetManifest:
+    """
+    Maps static paths to their fingerprinted build outputs.
+
+    Reads static/dist/manifest.json written by tools/build_assets.py. Without
+    a build (e.g. in development) every path maps to itself, so templates
+    work unchanged and the plain files are served as before.
+    """
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self.path = os.path.join(static_folder, "dist", "manifest.json")
+        self.assets = {}
+        self.fingerprinted = set()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.assets = json.load(f)
+        except FileNotFoundError:
+            logger.info("No asset manifest found, serving unfingerprinted static files")
+            self.assets = {}
+        self.fingerprinted = set(self.assets.values())
+        return self
+
+    def resolve(self, filename):
+        return self.assets.get(filename, filename)
+
+    def encoded(self, filename):
+        """Best precompressed (encoding, filename) the client accepts, or None."""
+        accepted = request.accept_encodings
+        for encoding, suffix in ENCODINGS:
+            candidate = filename + suffix
+            if accepted.quality(encoding) and os.path.isfile(
+                os.path.join(self.static_folder, candidate)
+            ):
+                return encoding, candidate
+        return None
+
+
+def init_assets(app):
+    """Serve fingerprinted assets immutably and precompressed; expose asset_url() to templates."""
+    manifest = AssetManifest(app.static_folder).load()
+    app.extensions["asset_manifest"] = manifest
+    send_static_file = app.view_functions["static"]
+
+    def asset_url(filename):
+        return url_for("static", filename=manifest.resolve(filename))
+
+    @app.context_processor
+    def asset_helpers():
+        return {"asset_url": asset_url}
+
+    def static(filename):
+        if filename not in manifest.fingerprinted:
+            return send_static_file(filename=filename)
+
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoded = manifest.encoded(filename)
+
+        if encoded is None:
+            response = send_from_directory(app.static_folder, filename, mimetype=mimetype)
+        else:
+            encoding, path = encoded
+            response = send_from_directory(app.static_folder, path, mimetype=mimetype)
+            response.headers["Content-Encoding"] = encoding
+
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE
+        response.vary.add("Accept-Encoding")
+        return response
+
+    app.view_functions["static"] = static
@@ -0,0 +1,42 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Lazy initialization of the shared background thread pool."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=Config.BACKGROUND_WORKERS,
+                    thread_name_prefix="cover-background",
+                )
+    return _executor
+
+
+def run_in_background(app, fn, *args, executor=None):
+    """
+    Run fn(*args) on the background pool (or the given executor) inside an
+    app context.
+
+    Failures are logged rather than raised; callers must not depend on the
+    task having run. Returns the Future.
+    """
+
+    def task():
+        with app.app_context():
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.error(f"Background task {fn.__name__} failed: {e}")
+
+    return (executor or get_executor()).submit(task)
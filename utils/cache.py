@@ -0,0 +1,148 @@
+import time
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime
+
+from utils.metrics import RENDER_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshingCache:
+    """
+    In-process TTL cache with stale-while-revalidate refresh.
+
+    Fresh entries are returned as-is. Entries past their TTL but still inside
+    the stale window are returned immediately while a background thread
+    recomputes them. Concurrent callers for the same key share one computation.
+    """
+
+    def __init__(self, ttl=60, stale_ttl=600):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute, ttl=None, stale_ttl=None):
+        """
+        Return (value, computed_at) for key, computing it with compute() if needed.
+
+        Args:
+            key (str): Cache key
+            compute (callable): Zero-argument function producing the value
+            ttl (int, optional): Seconds an entry is served without refresh
+            stale_ttl (int, optional): Extra seconds a stale entry may be served
+                while it is refreshed in the background
+
+        Returns:
+            tuple: (value, datetime the value was computed, in UTC)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at, computed_at = entry
+                age = time.monotonic() - stored_at
+
+                if age < ttl:
+                    return value, computed_at
+
+                if age < ttl + stale_ttl:
+                    if key not in self._inflight:
+                        self._inflight[key] = threading.Event()
+                        threading.Thread(
+                            target=self._refresh,
+                            args=(key, compute),
+                            name=f"cache-refresh-{key}",
+                            daemon=True,
+                        ).start()
+                    return value, computed_at
+
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._inflight[key] = event
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0], entry[2]
+            # The shared computation failed; fall through and try ourselves
+            return self.get(key, compute, ttl=ttl, stale_ttl=stale_ttl)
+
+        try:
+            return self._store(key, compute())
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def invalidate(self, key=None):
+        """Drop one key, or every key when none is given."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _store(self, key, value):
+        computed_at = datetime.utcnow()
+        with self._lock:
+            self._entries[key] = (value, time.monotonic(), computed_at)
+        return value, computed_at
+
+    def _refresh(self, key, compute):
+        try:
+            self._store(key, compute())
+        except Exception as e:
+            logger.error(f"Background refresh failed for cache key {key}: {e}")
+        finally:
+            with self._lock:
+                event = self._inflight.pop(key, None)
+            if event is not None:
+                event.set()
+
+
+class RenderCache:
+    """
+    In-process LRU cache of rendered images, bounded by total bytes.
+
+    Keys must identify the rendering completely (source object, size and
+    overlay spec), so entries never need invalidating; old ones simply age
+    out when the byte budget is reached.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, render):
+        """Return the cached bytes for key, calling render() on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                RENDER_CACHE_REQUESTS.labels(result="hit").inc()
+                return value
+
+        RENDER_CACHE_REQUESTS.labels(result="miss").inc()
+        value = render()
+
+        if len(value) <= self.max_bytes:
+            with self._lock:
+                if key not in self._entries:
+                    self._entries[key] = value
+                    self._size += len(value)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return value
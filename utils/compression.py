@@ -0,0 +1,79 @@
+import gzip
+import logging
+
+from flask import request
+
+from config import Config
+from utils.metrics import track_stage, COMPRESSION_BYTES
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used instead
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Response types worth compressing on the fly; images are already compressed
+COMPRESSIBLE_TYPES = ("application/json",)
+
+
+def choose_encoding():
+    """Best encoding the client accepts: br if available, then gzip, else None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality("br"):
+        return "br"
+    if accepted.quality("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=Config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.COMPRESS_GZIP_LEVEL)
+
+
+def should_compress(response):
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return False
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    return (response.content_length or 0) >= Config.COMPRESS_MIN_BYTES
+
+
+def init_compression(app):
+    """
+    Compress JSON responses of at least COMPRESS_MIN_BYTES with br or gzip.
+
+    Register after init_metrics so the "compress" stage shows up in the
+    request's Server-Timing header.
+    """
+
+    @app.after_request
+    def compress_response(response):
+        if not should_compress(response):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = choose_encoding()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        with track_stage("compress"):
+            compressed = compress(data, encoding)
+
+        COMPRESSION_BYTES.labels(encoding=encoding, stage="raw").inc(len(data))
+        COMPRESSION_BYTES.labels(encoding=encoding, stage="sent").inc(len(compressed))
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        # The body changed, so a strong validator for it no longer holds
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
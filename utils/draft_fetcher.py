@@ -0,0 +1,365 @@
+import re
+import time
+import codecs
+import socket
+import logging
+import ipaddress
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from config import Config
+from utils.metrics import track_stage, DRAFT_FETCHES
+
+logger = logging.getLogger(__name__)
+
+FETCHABLE_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/markdown")
+MAX_REDIRECTS = 3
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class DraftFetchError(Exception):
+    """The draft could not be fetched or was refused."""
+
+
+class DraftSummaryParser(HTMLParser):
+    """Collects the title, meta description, headings and opening paragraphs of a page."""
+
+    SKIP = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "svg"}
+    HEADINGS = {"h1", "h2", "h3"}
+    BLOCKS = HEADINGS | {"p", "li", "title"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.description = ""
+        self.headings = []
+        self.paragraphs = []
+        self._skip_depth = 0
+        self._block = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip_depth += 1
+        elif tag == "meta" and not self.description:
+            attrs = dict(attrs)
+            if (attrs.get("name") or attrs.get("property") or "").lower() in (
+                "description",
+                "og:description",
+            ):
+                self.description = clean_text(attrs.get("content"))
+        elif tag in self.BLOCKS and not self._skip_depth:
+            self._block, self._text = tag, []
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == self._block:
+            text = clean_text("".join(self._text))
+            if text:
+                if tag == "title":
+                    self.title = self.title or text
+                elif tag in self.HEADINGS:
+                    self.headings.append(text)
+                else:
+                    self.paragraphs.append(text)
+            self._block = None
+
+    def handle_data(self, data):
+        if self._block and not self._skip_depth:
+            self._text.append(data)
+
+
+def clean_text(text):
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def truncate(text, limit):
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+def summarize(text, content_type="text/html", limit=None):
+    """
+    Short topical summary of a draft: its description (or opening paragraphs)
+    and main section headings, at most limit characters.
+    """
+    limit = limit or Config.DRAFT_SUMMARY_CHARS
+
+    if content_type not in ("text/html", "application/xhtml+xml"):
+        lines = [clean_text(line.lstrip("#*- ")) for line in text.splitlines()]
+        return truncate(" ".join(line for line in lines if line), limit)
+
+    parser = DraftSummaryParser()
+    parser.feed(text)
+    parser.close()
+
+    overview = parser.description or " ".join(
+        paragraph for paragraph in parser.paragraphs[:3] if len(paragraph) > 40
+    )
+    sections = [heading for heading in parser.headings if heading != parser.title][:6]
+
+    parts = []
+    if overview:
+        parts.append(overview.rstrip(".") + ".")
+    if sections:
+        parts.append("Sections: " + "; ".join(sections) + ".")
+    return truncate(" ".join(parts), limit)
+
+
+def decode_body(body, content_type_header):
+    """
+    Decode a (possibly truncated) page body.
+
+    Uses the charset from Content-Type when there is one. Without it,
+    requests would assume ISO-8859-1 for text/*, so the body is tried as
+    UTF-8 (tolerating a multi-byte character cut off by the size cap) and
+    otherwise decoded with the detected encoding.
+    """
+    match = re.search(r"charset=[\"']?([\w.:-]+)", content_type_header or "", re.IGNORECASE)
+    if match:
+        try:
+            return body.decode(match.group(1), errors="replace")
+        except LookupError:
+            pass
+
+    try:
+        return codecs.getincrementaldecoder("utf-8")().decode(body, final=False)
+    except UnicodeDecodeError:
+        pass
+
+    from charset_normalizer import from_bytes
+
+    best = from_bytes(body).best()
+    return body.decode(best.encoding if best else "utf-8", errors="replace")
+
+
+def check_url(url):
+    """
+    Refuse anything but http(s) URLs on public addresses.
+
+    Drafts are user-supplied, so without this the server could be pointed at
+    internal services. DRAFT_FETCH_ALLOW_PRIVATE lifts the address check for
+    local development and stand-in servers.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise DraftFetchError(f"Unsupported draft URL: {url}")
+
+    if Config.DRAFT_FETCH_ALLOW_PRIVATE:
+        return
+
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parts.hostname, parts.port or 443)}
+    except socket.gaierror as e:
+        raise DraftFetchError(f"Cannot resolve {parts.hostname}: {e}")
+
+    for address in addresses:
+        if not ipaddress.ip_address(address.split("%")[0]).is_global:
+            raise DraftFetchError(f"Refusing to fetch non-public address {address}")
+
+
+class DraftFetcher:
+    """
+    Fetches draft pages and caches their summaries per URL.
+
+    All fetches share one pooled requests session and run on a small thread
+    pool; the caller waits at most DRAFT_FETCH_TIMEOUT seconds overall and
+    abandons a fetch still running after that (its own socket timeouts end
+    it soon after). Each response is limited to DRAFT_FETCH_MAX_BYTES. A
+    summary is served from cache for DRAFT_CACHE_TTL seconds; after that it
+    is revalidated with If-None-Match / If-Modified-Since when the server
+    sent validators, so an unchanged draft costs a 304 rather than a
+    download. Failures are cached for DRAFT_ERROR_TTL seconds so a broken
+    link isn't retried on every generation.
+    """
+
+    def __init__(self, ttl=300, error_ttl=60, max_entries=1024):
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor = None
+
+    @property
+    def session(self):
+        """Lazily created pooled session (requests is only imported when a draft is fetched)."""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=Config.DRAFT_FETCH_POOL,
+                        pool_maxsize=Config.DRAFT_FETCH_POOL,
+                        max_retries=0,
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers["User-Agent"] = "BlogCoverGenerator/1.0 (+draft summary)"
+                    self._session = session
+        return self._session
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=Config.DRAFT_FETCH_POOL,
+                        thread_name_prefix="draft-fetch",
+                    )
+        return self._executor
+
+    def summary(self, url):
+        """Return the cached or freshly fetched summary of url, or None if unavailable."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+
+        if entry is not None and entry["expires"] > now:
+            DRAFT_FETCHES.labels(result="hit").inc()
+            return entry["summary"]
+
+        deadline = now + Config.DRAFT_FETCH_TIMEOUT
+        try:
+            with track_stage("draft_fetch"):
+                future = self._get_executor().submit(self._fetch, url, entry, deadline)
+                try:
+                    entry = future.result(timeout=Config.DRAFT_FETCH_TIMEOUT)
+                except FuturesTimeout:
+                    future.cancel()
+                    raise DraftFetchError("Timed out fetching draft")
+        except DraftFetchError as e:
+            logger.warning(f"Draft fetch failed for {url}: {e}")
+            DRAFT_FETCHES.labels(result="error").inc()
+            entry = {
+                "summary": None,
+                "etag": None,
+                "last_modified": None,
+                "expires": now + self.error_ttl,
+            }
+
+        self._store(url, entry)
+        return entry["summary"]
+
+    def _store(self, url, entry):
+        with self._lock:
+            self._entries[url] = entry
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _fetch(self, url, cached, deadline):
+        """
+        Fetch and summarize url, revalidating cached when it has validators.
+
+        Raises:
+            DraftFetchError: For any failure, including network errors while
+                the body is being read
+        """
+        import requests
+        from urllib3.exceptions import HTTPError
+
+        headers = {}
+        if cached is not None and cached["summary"] is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            return self._fetch_response(url, cached, headers, deadline)
+        except (requests.RequestException, HTTPError, OSError) as e:
+            # urllib3 and socket errors come straight from reading the raw body
+            raise DraftFetchError(str(e) or type(e).__name__)
+
+    def _fetch_response(self, url, cached, headers, deadline):
+        response = self._get(url, headers, deadline)
+        with response:
+            if response.status_code == 304 and headers:
+                DRAFT_FETCHES.labels(result="revalidated").inc()
+                return dict(cached, expires=time.monotonic() + self.ttl)
+
+            if response.status_code != 200:
+                raise DraftFetchError(f"HTTP {response.status_code}")
+
+            content_type = response.headers.get("Content-Type", "text/html").split(";")[0].strip().lower()
+            if content_type not in FETCHABLE_TYPES:
+                raise DraftFetchError(f"Unsupported content type {content_type}")
+
+            body = self._read_limited(response, deadline)
+            text = decode_body(body, response.headers.get("Content-Type"))
+
+            DRAFT_FETCHES.labels(result="fetched").inc()
+            return {
+                "summary": summarize(text, content_type) or None,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "expires": time.monotonic() + self.ttl,
+            }
+
+    def _get(self, url, headers, deadline):
+        """GET with redirects followed by hand, so every hop passes check_url."""
+        for _ in range(MAX_REDIRECTS + 1):
+            check_url(url)
+            remaining = max(0.1, deadline - time.monotonic())
+            response = self.session.get(
+                url,
+                headers=headers,
+                stream=True,
+                allow_redirects=False,
+                timeout=(min(remaining, Config.DRAFT_FETCH_CONNECT_TIMEOUT), remaining),
+            )
+            if not response.is_redirect:
+                return response
+            url = urljoin(url, response.headers["Location"])
+            response.close()
+        raise DraftFetchError("Too many redirects")
+
+    @staticmethod
+    def _read_limited(response, deadline):
+        """
+        Read at most DRAFT_FETCH_MAX_BYTES; the summary only needs the top of
+        the page. The socket timeout is cut to the time left before each
+        read, so a server trickling bytes can't keep the worker past the
+        deadline for long.
+        """
+        limit = Config.DRAFT_FETCH_MAX_BYTES
+        connection = getattr(response.raw, "connection", None)
+        sock = getattr(connection, "sock", None)
+
+        chunks, size = [], 0
+        while size < limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DraftFetchError("Timed out reading draft")
+            if sock is not None:
+                sock.settimeout(remaining)
+            chunk = response.raw.read(min(16 * 1024, limit - size), decode_content=True)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return b"".join(chunks)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+draft_fetcher = DraftFetcher(
+    ttl=Config.DRAFT_CACHE_TTL,
+    error_ttl=Config.DRAFT_ERROR_TTL,
+    max_entries=Config.DRAFT_CACHE_ENTRIES,
+)
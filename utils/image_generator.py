@@ -1,10 +1,15 @@
 import os
 import random
-from google import genai
+import asyncio
 from PIL import Image
 import io
 import logging
 
+from config import Config
+from utils.metrics import track_stage, MOCK_FALLBACKS
+from utils.draft_fetcher import draft_fetcher
+from utils.process_pool import run_image_task
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,11 +30,20 @@ class NanoBananaClient:
         )
 
         if not self.mock_mode:
-            self.client = genai.Client(api_key=self.api_key)
+            # The SDK takes most of a second to import; only pay for it when used
+            from google import genai
+            from google.genai import types
+
+            # GOOGLE_API_BASE_URL points the SDK at a stand-in server for load tests
+            http_options = types.HttpOptions(
+                base_url=os.getenv("GOOGLE_API_BASE_URL") or None,
+                timeout=int(os.getenv("GOOGLE_API_TIMEOUT_MS", 120000)),
+            )
+            self.client = genai.Client(api_key=self.api_key, http_options=http_options)
         else:
             logger.info("Running in MOCK MODE - using placeholder images")
 
-    def generate_images(self, title, style, draft_link=None, count=2):
+    def generate_images(self, title, style, draft_link=None, count=2, fallback=True):
         """
         Generate blog cover images based on title and style.
 
@@ -38,13 +52,16 @@ class NanoBananaClient:
             style (str): Visual style (Creative, Cinematic, Minimalist, Professional, Abstract, Tech)
             draft_link (str, optional): Link to draft article for context
             count (int): Number of images to generate (default: 2)
+            fallback (bool): Return placeholder images if the model call fails;
+                with False the error is raised instead
 
         Returns:
             list: List of image bytes
         """
-        prompt = self._construct_prompt(title, style, draft_link)
+        prompt = self._build_prompt(title, style, draft_link)
 
         if self.mock_mode:
+            MOCK_FALLBACKS.labels(reason="mock_mode").inc()
             return self._generate_mock_images(count)
 
         try:
@@ -54,29 +71,115 @@ class NanoBananaClient:
                     f"Generating image {i+1}/{count} with NanoBanana (Gemini 2.5 Flash Image)..."
                 )
 
-                response = self.client.models.generate_content(
-                    model=self.MODEL_NAME,
-                    contents=[prompt],
-                )
+                with track_stage("model_call"):
+                    response = self.client.models.generate_content(
+                        model=self.MODEL_NAME,
+                        contents=[prompt],
+                    )
 
-                for part in response.parts:
-                    if part.inline_data is not None:
-                        image_bytes = part.inline_data.data
-                        images.append(image_bytes)
-                        logger.info(f"✓ Image {i+1} generated successfully")
-                        break
+                image_bytes = self._extract_image(response)
+                if image_bytes is not None:
+                    images.append(image_bytes)
+                    logger.info(f"✓ Image {i+1} generated successfully")
 
             return images
 
         except Exception as e:
             logger.error(f"✗ Error generating images with NanoBanana: {e}")
+            if not fallback:
+                raise
             logger.warning("Falling back to mock images...")
+            MOCK_FALLBACKS.labels(reason="model_error").inc()
             return self._generate_mock_images(count)
 
-    def _construct_prompt(self, title, style, draft_link=None):
+    async def generate_images_async(self, title, style, draft_link=None, count=2, fallback=True):
+        """
+        Async variant of generate_images for use from an event loop.
+
+        Requests the images concurrently through the SDK's native async client,
+        so a caller waiting on the model doesn't hold a thread.
+
+        Returns:
+            list: List of image bytes
+        """
+        # Fetching the draft blocks, so build the prompt off the event loop
+        prompt = await asyncio.to_thread(self._build_prompt, title, style, draft_link)
+
+        if self.mock_mode:
+            MOCK_FALLBACKS.labels(reason="mock_mode").inc()
+            return await asyncio.to_thread(self._generate_mock_images, count)
+
+        try:
+            logger.info(
+                f"Generating {count} images concurrently with NanoBanana (Gemini 2.5 Flash Image)..."
+            )
+
+            with track_stage("model_call_batch"):
+                responses = await asyncio.gather(
+                    *(
+                        self.client.aio.models.generate_content(
+                            model=self.MODEL_NAME,
+                            contents=[prompt],
+                        )
+                        for _ in range(count)
+                    )
+                )
+
+            images = [
+                image_bytes
+                for image_bytes in map(self._extract_image, responses)
+                if image_bytes is not None
+            ]
+            logger.info(f"✓ {len(images)} images generated successfully")
+            return images
+
+        except Exception as e:
+            logger.error(f"✗ Error generating images with NanoBanana: {e}")
+            if not fallback:
+                raise
+            logger.warning("Falling back to mock images...")
+            MOCK_FALLBACKS.labels(reason="model_error").inc()
+            return await asyncio.to_thread(self._generate_mock_images, count)
+
+    async def aclose(self):
+        """
+        Close the SDK's async HTTP client.
+
+        Its connections belong to the event loop that first used them, so a
+        client used from asyncio.run() must be closed before that loop ends
+        and not reused on another one.
+        """
+        if not self.mock_mode:
+            await self.client.aio.aclose()
+
+    def _build_prompt(self, title, style, draft_link=None):
+        """Summarize the draft, if any, and construct the prompt."""
+        draft_summary = None
+        if draft_link and Config.DRAFT_FETCH_ENABLED:
+            try:
+                draft_summary = draft_fetcher.summary(draft_link)
+            except Exception as e:
+                # A bad link must never fail the generation itself
+                logger.warning(f"Ignoring draft link {draft_link}: {e}")
+
+        with track_stage("prompt_build"):
+            return self._construct_prompt(title, style, draft_summary)
+
+    @staticmethod
+    def _extract_image(response):
+        """Return the first inline image in a generate_content response, if any."""
+        for part in response.parts:
+            if part.inline_data is not None:
+                return part.inline_data.data
+        return None
+
+    def _construct_prompt(self, title, style, draft_summary=None):
         """
         Construct optimized prompts for NanoBanana (Gemini 2.5 Flash Image) based on title and style.
 
+        draft_summary, when given, is a short summary of the article (see
+        utils.draft_fetcher) that steers the imagery towards its actual topic.
+
         NanoBanana performs best with:
         - Detailed, descriptive language
         - Specific visual elements and composition
@@ -153,6 +256,13 @@ class NanoBananaClient:
 
         prompt_parts = [
             f"Create a professional blog cover image representing the topic: '{title}'.",
+        ]
+        if draft_summary:
+            prompt_parts.append(
+                f"The article covers: {draft_summary} "
+                "Use concrete visual motifs drawn from this content."
+            )
+        prompt_parts += [
             style_config["description"],
             "The image should be visually striking and immediately capture attention.",
             "High resolution, photorealistic quality with perfect composition and professional color grading.",
@@ -170,6 +280,11 @@ class NanoBananaClient:
         Generate realistic placeholder images for testing/development.
         Creates gradient images in 16:9 aspect ratio.
         """
+        with track_stage("mock_generate"):
+            return run_image_task(NanoBananaClient._render_mock_images, None, count)
+
+    @staticmethod
+    def _render_mock_images(count):
         images = []
         width, height = 1600, 900
 
@@ -1,51 +1,290 @@
 from PIL import Image, ImageDraw, ImageFont
 import io
+import queue
+import threading
+
+from config import Config
+from utils.metrics import track_stage
+
+# Pillow's own decompression-bomb guard as a backstop for any decode path
+Image.MAX_IMAGE_PIXELS = Config.IMAGE_MAX_DECODE_PIXELS
+
+
+class _EncodeCancelled(Exception):
+    pass
+
+
+class ImageTooLarge(ValueError):
+    """
+    A source image or render request is over the decode/render budget.
+
+    reason is "decode" (source pixels), "target" (output size), "font"
+    (overlay text size) or "memory" (estimated peak working set).
+    """
+
+    def __init__(self, message, reason):
+        # Both in args so the exception survives pickling out of the process pool
+        super().__init__(message, reason)
+
+    @property
+    def reason(self):
+        return self.args[1]
+
+    def __str__(self):
+        return self.args[0]
+
 
 class ImageProcessor:
+    FONT_PATHS = {
+        'Inter': ['/System/Library/Fonts/Helvetica.ttc', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'],
+        'Arial': ['/System/Library/Fonts/Supplemental/Arial.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'],
+        'Helvetica': ['/System/Library/Fonts/Helvetica.ttc', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'],
+        'Georgia': ['/System/Library/Fonts/Supplemental/Georgia.ttf', '/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf'],
+        'Times New Roman': ['/System/Library/Fonts/Supplemental/Times New Roman.ttf', '/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf'],
+        'Courier New': ['/System/Library/Fonts/Supplemental/Courier New.ttf', '/usr/share/fonts/truetype/liberation/LiberationMono-Regular.ttf'],
+        'Verdana': ['/System/Library/Fonts/Supplemental/Verdana.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'],
+        'Comic Sans MS': ['/System/Library/Fonts/Supplemental/Comic Sans MS.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'],
+        'Impact': ['/System/Library/Fonts/Supplemental/Impact.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf'],
+        'Trebuchet MS': ['/System/Library/Fonts/Supplemental/Trebuchet MS.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf']
+    }
+
+    PLATFORM_DIMENSIONS = {
+        "Hashnode": (1600, 840),
+        "Dev.to": (1000, 420),
+        "Medium": (1500, 750),
+    }
+
+    @staticmethod
+    def overlay_spec(text_overlay):
+        """
+        Normalize a text overlay request into the spec stored on a saved image.
+
+        Returns None when there is no text to draw, otherwise a dict with
+        every field filled in, so equal overlays compare (and cache) equal.
+        """
+        if not text_overlay or not text_overlay.get('text'):
+            return None
+
+        return {
+            'text': str(text_overlay['text']),
+            'font': text_overlay.get('font', 'Inter'),
+            'size': int(text_overlay.get('size', 36)),
+            'color': text_overlay.get('color', '#FFFFFF'),
+            'position': text_overlay.get('position', 'bottom-center'),
+            'shadow': bool(text_overlay.get('shadow', True)),
+        }
+
+    @staticmethod
+    def check_request(platform, custom_dims=None, text_overlay=None):
+        """
+        Check the requested output size and overlay font size against the
+        render budget, before any image is fetched or decoded.
+
+        Raises:
+            ImageTooLarge: If either is over its limit
+        """
+        if platform is not None:
+            width, height = ImageProcessor._get_dimensions(platform, custom_dims)
+            if (
+                max(width, height) > Config.IMAGE_MAX_DIMENSION
+                or width * height > Config.IMAGE_MAX_TARGET_PIXELS
+            ):
+                raise ImageTooLarge(
+                    f"Requested size {width}x{height} is too large (at most "
+                    f"{Config.IMAGE_MAX_DIMENSION}px per side and "
+                    f"{Config.IMAGE_MAX_TARGET_PIXELS:,} pixels)",
+                    "target",
+                )
+
+        if text_overlay and text_overlay.get('text'):
+            size = int(text_overlay.get('size', 36))
+            if size > Config.IMAGE_MAX_FONT_SIZE:
+                raise ImageTooLarge(
+                    f"Text size {size} is too large (at most {Config.IMAGE_MAX_FONT_SIZE})",
+                    "font",
+                )
+
+    @staticmethod
+    def open_image(image_data):
+        """
+        Open image_data without decoding it and check the dimensions from its
+        header against the decode budget.
+
+        Raises:
+            ImageTooLarge: If decoding it would exceed IMAGE_MAX_DECODE_PIXELS
+        """
+        try:
+            img = Image.open(io.BytesIO(image_data))
+        except Image.DecompressionBombError as e:
+            raise ImageTooLarge(str(e), "decode")
+
+        width, height = img.size
+        if width * height > Config.IMAGE_MAX_DECODE_PIXELS:
+            raise ImageTooLarge(
+                f"Source image {width}x{height} is too large to decode", "decode"
+            )
+        return img
+
+    @staticmethod
+    def estimate_memory(source_size, target_size):
+        """
+        Rough peak bytes to render: the decoded source and the output alive
+        together at 4 bytes per pixel, plus about half the output again for
+        encoder buffers.
+        """
+        source_pixels = source_size[0] * source_size[1]
+        target_pixels = target_size[0] * target_size[1]
+        return int((source_pixels + target_pixels * 1.5) * 4)
+
     @staticmethod
     def process_image(image_data, platform, custom_dims=None, text_overlay=None):
         """Resize/crop image to platform dimensions and add optional text overlay."""
-        img = Image.open(io.BytesIO(image_data))
+        img = ImageProcessor.prepare_image(image_data, platform, custom_dims, text_overlay)
+        if img is None:
+            return image_data
+
+        with track_stage("image_encode"):
+            output = io.BytesIO()
+            img.save(output, format='PNG')
+            return output.getvalue()
+
+    @staticmethod
+    def prepare_image(image_data, platform, custom_dims=None, text_overlay=None):
+        """
+        Decode, resize/crop and draw the overlay, without encoding.
+
+        Returns the finished PIL image, or None when nothing needs doing and
+        the original bytes can be used as they are.
+
+        Raises:
+            ImageTooLarge: If the request, the source image (checked from its
+                header, before decoding) or the estimated peak memory is over
+                budget
+        """
+        ImageProcessor.check_request(platform, custom_dims, text_overlay)
+        has_text = bool(text_overlay and text_overlay.get('text'))
 
         # If platform is None, skip resizing and only apply text overlay
-        if platform is not None:
+        resize = platform is not None
+        if resize:
             target_width, target_height = ImageProcessor._get_dimensions(platform, custom_dims)
 
             if target_width == 0 or target_height == 0:
                 # If dimensions are invalid, only apply text overlay if provided
-                if text_overlay and text_overlay.get('text'):
-                    img = ImageProcessor._add_text_overlay(img, text_overlay)
-                    output = io.BytesIO()
-                    img.save(output, format='PNG')
-                    return output.getvalue()
-                return image_data
-
-            img_ratio = img.width / img.height
-            target_ratio = target_width / target_height
-
-            if img_ratio > target_ratio:
-                new_height = target_height
-                new_width = int(new_height * img_ratio)
-            else:
-                new_width = target_width
-                new_height = int(new_width / img_ratio)
+                if not has_text:
+                    return None
+                resize = False
+
+        with track_stage("image_decode"):
+            img = ImageProcessor.open_image(image_data)
+
+            target_size = (target_width, target_height) if resize else img.size
+            budget = Config.IMAGE_MEMORY_BUDGET_MB * 1024 * 1024
+            if ImageProcessor.estimate_memory(img.size, target_size) > budget:
+                # JPEG can decode at 1/2, 1/4 or 1/8 scale when the output is smaller
+                if resize and img.format == 'JPEG':
+                    img.draft(img.mode, target_size)
+                if ImageProcessor.estimate_memory(img.size, target_size) > budget:
+                    raise ImageTooLarge(
+                        f"Rendering {img.width}x{img.height} to "
+                        f"{target_size[0]}x{target_size[1]} needs more memory than allowed",
+                        "memory",
+                    )
+
+            img.load()
+
+        if resize:
+            with track_stage("image_resize"):
+                img_ratio = img.width / img.height
+                target_ratio = target_width / target_height
+
+                # Resample only the centred region that survives the crop,
+                # so no oversized intermediate image is ever allocated
+                if img_ratio > target_ratio:
+                    box_width = img.height * target_ratio
+                    left = (img.width - box_width) / 2
+                    box = (left, 0, left + box_width, img.height)
+                else:
+                    box_height = img.width / target_ratio
+                    top = (img.height - box_height) / 2
+                    box = (0, top, img.width, top + box_height)
+
+                img = img.resize(
+                    (target_width, target_height), Image.Resampling.LANCZOS, box=box
+                )
 
-            img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # Apply text overlay if provided
+        if has_text:
+            with track_stage("image_text"):
+                img = ImageProcessor._add_text_overlay(img, text_overlay)
 
-            left = (new_width - target_width) / 2
-            top = (new_height - target_height) / 2
-            right = (new_width + target_width) / 2
-            bottom = (new_height + target_height) / 2
+        return img
 
-            img = img.crop((left, top, right, bottom))
+    @staticmethod
+    def iter_encoded(img, fmt='PNG', max_pending=4):
+        """
+        Encode img and yield the output in chunks as the encoder produces them.
+
+        The encoder runs on a helper thread and blocks once max_pending
+        chunks are waiting, so memory stays at the decoded image plus a few
+        encoder blocks however large the output is. Closing the generator
+        early (e.g. a client disconnect) stops the encoder.
+        """
+        chunks = queue.Queue(maxsize=max_pending)
+        cancelled = threading.Event()
+        done = object()
+
+        class _Writer:
+            def write(self, data):
+                if cancelled.is_set():
+                    raise _EncodeCancelled()
+                chunks.put(bytes(data))
+                return len(data)
+
+        def encode():
+            try:
+                with track_stage("image_encode"):
+                    img.save(_Writer(), format=fmt)
+                chunks.put(done)
+            except _EncodeCancelled:
+                pass
+            except Exception as e:
+                chunks.put(e)
+
+        threading.Thread(target=encode, name="image-encode", daemon=True).start()
+
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            cancelled.set()
+            # Unblock the encoder if it is waiting on a full queue
+            while not chunks.empty():
+                chunks.get_nowait()
 
-        # Apply text overlay if provided
-        if text_overlay and text_overlay.get('text'):
-            img = ImageProcessor._add_text_overlay(img, text_overlay)
+    @staticmethod
+    def create_preview(image_data, max_width=800, fmt='WEBP', quality=80):
+        """Downscale image to max_width and encode it as a lossy preview."""
+        img = ImageProcessor.open_image(image_data)
 
-        output = io.BytesIO()
-        img.save(output, format='PNG')
-        return output.getvalue()
+        if fmt == 'JPEG':
+            # Let the JPEG decoder skip detail we're about to throw away
+            img.draft('RGB', (max_width, max_width))
+
+        if img.mode not in ('RGB', 'RGBA') or (fmt == 'JPEG' and img.mode == 'RGBA'):
+            img = img.convert('RGB')
+
+        with track_stage("preview_encode"):
+            img.thumbnail((max_width, max_width * 4), Image.Resampling.LANCZOS)
+
+            output = io.BytesIO()
+            img.save(output, format=fmt, quality=quality)
+            return output.getvalue()
 
     @staticmethod
     def _add_text_overlay(img, text_overlay):
@@ -57,21 +296,11 @@ class ImageProcessor:
         color = text_overlay.get('color', '#FFFFFF')
         position = text_overlay.get('position', 'bottom-center')
         shadow = text_overlay.get('shadow', True)
-        font_paths = {
-            'Inter': ['/System/Library/Fonts/Helvetica.ttc', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'],
-            'Arial': ['/System/Library/Fonts/Supplemental/Arial.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'],
-            'Helvetica': ['/System/Library/Fonts/Helvetica.ttc', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'],
-            'Georgia': ['/System/Library/Fonts/Supplemental/Georgia.ttf', '/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf'],
-            'Times New Roman': ['/System/Library/Fonts/Supplemental/Times New Roman.ttf', '/usr/share/fonts/truetype/liberation/LiberationSerif-Regular.ttf'],
-            'Courier New': ['/System/Library/Fonts/Supplemental/Courier New.ttf', '/usr/share/fonts/truetype/liberation/LiberationMono-Regular.ttf'],
-            'Verdana': ['/System/Library/Fonts/Supplemental/Verdana.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'],
-            'Comic Sans MS': ['/System/Library/Fonts/Supplemental/Comic Sans MS.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'],
-            'Impact': ['/System/Library/Fonts/Supplemental/Impact.ttf', '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf'],
-            'Trebuchet MS': ['/System/Library/Fonts/Supplemental/Trebuchet MS.ttf', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf']
-        }
 
         font = None
-        font_paths_to_try = font_paths.get(font_name, font_paths['Inter'])
+        font_paths_to_try = ImageProcessor.FONT_PATHS.get(
+            font_name, ImageProcessor.FONT_PATHS['Inter']
+        )
 
         for font_path in font_paths_to_try:
             try:
@@ -172,13 +401,7 @@ class ImageProcessor:
 
     @staticmethod
     def _get_dimensions(platform, custom_dims):
-        platforms = {
-            "Hashnode": (1600, 840),
-            "Dev.to": (1000, 420),
-            "Medium": (1500, 750),
-        }
-        
         if platform == "Custom" and custom_dims:
             return int(custom_dims.get('width', 0)), int(custom_dims.get('height', 0))
             
-        return platforms.get(platform, (0, 0))
+        return ImageProcessor.PLATFORM_DIMENSIONS.get(platform, (0, 0))
@@ -0,0 +1,68 @@
+import logging
+
+from flask.json.provider import DefaultJSONProvider
+
+from config import Config
+from utils.metrics import track_stage
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library provider is used instead
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Output matches DefaultJSONProvider's: keys are sorted, datetimes still go
+    through Flask's default hook (HTTP dates), and anything else orjson
+    can't encode natively is handed to the same default. Non-ASCII text is
+    written as UTF-8 rather than escaped. Calls with json.dumps-specific
+    keyword arguments fall back to the standard library.
+    """
+
+    def options(self):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options()).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Pretty-printed debug output keeps the standard library's indentation
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        with track_stage("json_encode"):
+            data = orjson.dumps(
+                obj, default=self.default, option=self.options() | orjson.OPT_APPEND_NEWLINE
+            )
+        return self._app.response_class(data, mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the JSON provider selected by JSON_PROVIDER ("auto", "orjson" or "stdlib")."""
+    choice = Config.JSON_PROVIDER
+
+    if choice == "stdlib":
+        return
+
+    if orjson is None:
+        if choice == "orjson":
+            logger.warning("JSON_PROVIDER=orjson but orjson is not installed, using stdlib json")
+        return
+
+    app.json = OrjsonProvider(app)
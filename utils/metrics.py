@@ -0,0 +1,213 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+from flask import Response, request, g, has_request_context
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stages range from sub-millisecond DB commits to multi-second model calls
+STAGE_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0,
+)
+
+STAGE_DURATION = Histogram(
+    "cover_stage_duration_seconds",
+    "Time spent in each stage of generation, processing and storage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+
+REQUEST_DURATION = Histogram(
+    "cover_http_request_duration_seconds",
+    "HTTP request latency by endpoint",
+    ["endpoint", "method", "status"],
+    buckets=STAGE_BUCKETS,
+)
+
+REQUESTS_IN_FLIGHT = Gauge(
+    "cover_http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+MOCK_FALLBACKS = Counter(
+    "cover_mock_fallback_total",
+    "Generations served with placeholder images instead of the model",
+    ["reason"],
+)
+
+PENDING_IMAGE_BYTES = Gauge(
+    "cover_pending_image_bytes",
+    "Bytes of generated images held in memory awaiting save",
+    multiprocess_mode="livesum",
+)
+
+PENDING_GENERATIONS = Gauge(
+    "cover_pending_generations",
+    "Generations held in memory awaiting save",
+    multiprocess_mode="livesum",
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "cover_db_queries_per_request",
+    "SQL statements executed while handling one request",
+    ["endpoint"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+
+DB_TIME_PER_REQUEST = Histogram(
+    "cover_db_time_per_request_seconds",
+    "Time spent in SQL statements while handling one request",
+    ["endpoint"],
+    buckets=STAGE_BUCKETS,
+)
+
+SLOW_QUERIES = Counter(
+    "cover_db_slow_queries_total",
+    "SQL statements slower than SLOW_QUERY_MS",
+    ["endpoint"],
+)
+
+REPEATED_QUERY_REQUESTS = Counter(
+    "cover_db_repeated_query_requests_total",
+    "Requests that ran one query shape more than QUERY_REPEAT_LIMIT times (likely N+1)",
+    ["endpoint"],
+)
+
+RENDER_CACHE_REQUESTS = Counter(
+    "cover_render_cache_requests_total",
+    "Lookups in the rendered-image cache",
+    ["result"],
+)
+
+IMAGE_POOL_QUEUED = Gauge(
+    "cover_image_pool_tasks",
+    "Image tasks running or waiting in the process pool",
+    multiprocess_mode="livesum",
+)
+
+IMAGE_POOL_REJECTIONS = Counter(
+    "cover_image_pool_rejections_total",
+    "Image tasks shed because the process pool queue was full",
+)
+
+
+COMPRESSION_BYTES = Counter(
+    "cover_compression_bytes_total",
+    "Bytes of compressed responses before (raw) and after (sent) compression",
+    ["encoding", "stage"],
+)
+
+
+DRAFT_FETCHES = Counter(
+    "cover_draft_fetches_total",
+    "Draft summary lookups by outcome (hit, revalidated, fetched, error)",
+    ["result"],
+)
+
+
+SPECULATIVE_GENERATIONS = Counter(
+    "cover_speculative_generations_total",
+    "Speculative generations from prefetch hints (started, adopted, wasted, rejected)",
+    ["result"],
+)
+
+
+IMAGE_BUDGET_REJECTIONS = Counter(
+    "cover_image_budget_rejections_total",
+    "Image renders refused by the decode/render budget",
+    ["reason"],
+)
+
+
+@contextmanager
+def track_stage(stage):
+    """
+    Time the enclosed block into the per-stage latency histogram.
+
+    Inside a request the duration is also added to that request's
+    Server-Timing spans.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.labels(stage=stage).observe(elapsed)
+
+        if has_request_context():
+            spans = g.setdefault("timing_spans", {})
+            spans[stage] = spans.get(stage, 0.0) + elapsed
+
+
+def server_timing_header(spans, total):
+    """Format stage durations (seconds) as a Server-Timing header value."""
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in spans.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def metrics_response():
+    """
+    Render metrics in the Prometheus text format.
+
+    Under gunicorn with several workers, set PROMETHEUS_MULTIPROC_DIR so each
+    worker writes its samples to shared files and any worker can serve the
+    aggregate. If METRICS_TOKEN is set, scrapers must send it as a bearer token.
+    """
+    token = os.getenv("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return Response("Unauthorized", status=401)
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest()
+
+    return Response(data, mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Register request instrumentation and the /metrics endpoint on app."""
+
+    @app.before_request
+    def start_request_timer():
+        request.environ["metrics.start"] = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    @app.after_request
+    def record_request(response):
+        start = request.environ.get("metrics.start")
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            REQUEST_DURATION.labels(
+                endpoint=request.endpoint or "unmatched",
+                method=request.method,
+                status=response.status_code,
+            ).observe(elapsed)
+
+            response.headers["Server-Timing"] = server_timing_header(
+                g.get("timing_spans", {}), elapsed
+            )
+        return response
+
+    @app.teardown_request
+    def finish_request(error=None):
+        if request.environ.pop("metrics.start", None) is not None:
+            REQUESTS_IN_FLIGHT.dec()
+
+    app.add_url_rule("/metrics", "metrics", metrics_response)
@@ -0,0 +1,86 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) position as an opaque URL-safe cursor."""
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (created_at, id), or None when the cursor is missing or malformed
+    """
+    if not cursor:
+        return None
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeError):
+        return None
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Clamp a requested page size to [1, maximum]."""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+
+    return max(1, min(limit, maximum))
+
+
+def keyset_page(query, created_column, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Fetch one page of query ordered newest first by (created_at, id).
+
+    The filter only ever seeks past the last row of the previous page, so
+    every page costs the same regardless of how deep the caller has scrolled.
+
+    Args:
+        query: SQLAlchemy query to paginate
+        created_column: Timestamp column to order by
+        id_column: Unique tie-breaker column
+        cursor (str, optional): Cursor returned with the previous page
+        limit (int): Page size
+
+    Returns:
+        tuple: (rows, next_cursor), where next_cursor is None on the last page
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        created_at, row_id = position
+        query = query.filter(
+            or_(
+                created_column < created_at,
+                and_(created_column == created_at, id_column < row_id),
+            )
+        )
+
+    rows = (
+        query.order_by(created_column.desc(), id_column.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        # Rows may be entities or (entity, extra, ...) tuples
+        entity = last[0] if isinstance(last, tuple) or hasattr(last, "_fields") else last
+        next_cursor = encode_cursor(
+            getattr(entity, created_column.key), getattr(entity, id_column.key)
+        )
+
+    return rows, next_cursor
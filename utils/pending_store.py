@@ -0,0 +1,96 @@
+import time
+import threading
+
+from utils.metrics import PENDING_IMAGE_BYTES, PENDING_GENERATIONS
+
+
+class PendingImageStore:
+    """
+    In-memory store for generated images that haven't been saved yet.
+
+    Behaves like a dict of generation_id -> list of image bytes, but entries
+    expire after ttl seconds so abandoned generations don't pin memory forever.
+    Encoded previews are cached alongside the originals and dropped with them.
+    """
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self._entries = {}
+        self._previews = {}
+        self._lock = threading.Lock()
+
+    def __setitem__(self, generation_id, images):
+        with self._lock:
+            self._sweep()
+            self._drop(generation_id)
+            self._entries[generation_id] = (images, time.monotonic() + self.ttl)
+            PENDING_IMAGE_BYTES.inc(sum(len(img) for img in images))
+            PENDING_GENERATIONS.inc()
+
+    def __getitem__(self, generation_id):
+        with self._lock:
+            entry = self._entries.get(generation_id)
+            if entry is None or entry[1] <= time.monotonic():
+                self._drop(generation_id)
+                raise KeyError(generation_id)
+            return entry[0]
+
+    def __contains__(self, generation_id):
+        try:
+            self[generation_id]
+        except KeyError:
+            return False
+        return True
+
+    def __delitem__(self, generation_id):
+        with self._lock:
+            self._drop(generation_id)
+
+    def expires_in(self, generation_id):
+        """Seconds until generation_id expires, or 0 if it's gone."""
+        with self._lock:
+            entry = self._entries.get(generation_id)
+            if entry is None:
+                return 0
+            return max(0, int(entry[1] - time.monotonic()))
+
+    def get_preview(self, generation_id, index, fmt, build):
+        """
+        Return the cached preview for one image, building it on first use.
+
+        Args:
+            generation_id (str): Pending generation ID
+            index (int): Image index within the generation
+            fmt (str): Preview format, part of the cache key
+            build (callable): Function turning original bytes into preview bytes
+
+        Raises:
+            KeyError: If the generation has expired
+            IndexError: If index is out of range
+        """
+        key = (generation_id, index, fmt)
+        with self._lock:
+            preview = self._previews.get(key)
+        if preview is not None:
+            return preview
+
+        original = self[generation_id][index]
+        preview = build(original)
+
+        with self._lock:
+            if generation_id in self._entries:
+                self._previews[key] = preview
+        return preview
+
+    def _drop(self, generation_id):
+        entry = self._entries.pop(generation_id, None)
+        if entry is not None:
+            PENDING_IMAGE_BYTES.dec(sum(len(img) for img in entry[0]))
+            PENDING_GENERATIONS.dec()
+        for key in [k for k in self._previews if k[0] == generation_id]:
+            del self._previews[key]
+
+    def _sweep(self):
+        now = time.monotonic()
+        for generation_id in [g for g, (_, exp) in self._entries.items() if exp <= now]:
+            self._drop(generation_id)
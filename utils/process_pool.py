@@ -0,0 +1,122 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from config import Config
+from utils.metrics import track_stage, IMAGE_POOL_QUEUED, IMAGE_POOL_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+class ImagePoolBusy(Exception):
+    """The image pool's queue is full; the caller should shed the request."""
+
+
+def pool_size():
+    """Configured worker count: IMAGE_WORKERS as a number, "auto" for one per CPU, 0 for off."""
+    value = Config.IMAGE_WORKERS.strip().lower()
+    if value == "auto":
+        return os.cpu_count() or 1
+    return max(0, int(value))
+
+
+def get_pool():
+    """Lazy initialization of the image process pool, or None when disabled."""
+    global _pool, _slots
+    if _pool is None and pool_size():
+        with _pool_lock:
+            if _pool is None:
+                workers = pool_size()
+                # forkserver children start clean instead of inheriting the
+                # locks and threads of a busy web worker
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _slots = threading.BoundedSemaphore(workers + Config.IMAGE_QUEUE_LIMIT)
+                _pool = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context(method)
+                )
+                logger.info(f"Image process pool started with {workers} workers ({method})")
+    return _pool
+
+
+def _to_shared(data):
+    shm = SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    return shm
+
+
+def _read_shared(name, size, unlink=False):
+    shm = SharedMemory(name=name)
+    try:
+        return bytes(shm.buf[:size])
+    finally:
+        shm.close()
+        if unlink:
+            shm.unlink()
+
+
+def _run_shared(fn, source, args, kwargs):
+    """Pool-side: read input from shared memory, run fn, write outputs back to shared memory."""
+    data = _read_shared(*source) if source else None
+    result = fn(data, *args, **kwargs) if source else fn(*args, **kwargs)
+
+    outputs = result if isinstance(result, list) else [result]
+    refs = []
+    for item in outputs:
+        shm = _to_shared(item)
+        refs.append((shm.name, len(item)))
+        shm.close()
+    return refs, isinstance(result, list)
+
+
+def run_image_task(fn, data=None, *args, **kwargs):
+    """
+    Run a CPU-bound image function, in the process pool when one is configured.
+
+    fn(data, *args, **kwargs) must be a module- or class-level function
+    returning bytes or a list of bytes; with data=None it is called as
+    fn(*args, **kwargs). Image bytes cross the process boundary through
+    shared memory in both directions rather than being pickled into the
+    task queue. Without a pool the call simply runs inline.
+
+    Raises:
+        ImagePoolBusy: If IMAGE_QUEUE_LIMIT tasks are already waiting and no
+            slot frees up within IMAGE_QUEUE_TIMEOUT seconds
+    """
+    pool = get_pool()
+    if pool is None:
+        return fn(data, *args, **kwargs) if data is not None else fn(*args, **kwargs)
+
+    if not _slots.acquire(timeout=Config.IMAGE_QUEUE_TIMEOUT):
+        IMAGE_POOL_REJECTIONS.inc()
+        raise ImagePoolBusy("Image processing is at capacity, try again shortly")
+
+    source = None
+    IMAGE_POOL_QUEUED.inc()
+    try:
+        if data is not None:
+            source = _to_shared(data)
+        with track_stage("image_pool"):
+            future = pool.submit(
+                _run_shared,
+                fn,
+                (source.name, len(data)) if source else None,
+                args,
+                kwargs,
+            )
+            refs, is_list = future.result()
+    finally:
+        IMAGE_POOL_QUEUED.dec()
+        _slots.release()
+        if source is not None:
+            source.close()
+            source.unlink()
+
+    outputs = [_read_shared(name, size, unlink=True) for name, size in refs]
+    return outputs if is_list else outputs[0]
@@ -0,0 +1,115 @@
+import os
+import time
+import uuid
+import cProfile
+import logging
+import tempfile
+import threading
+
+from flask import request, g
+from flask_login import current_user
+
+logger = logging.getLogger(__name__)
+
+# cProfile hooks are process-wide on newer Pythons, so profile one request at a time
+_profile_lock = threading.Lock()
+
+
+def profile_dir(app):
+    path = app.config.get("PROFILE_DIR") or os.path.join(
+        tempfile.gettempdir(), "cover-profiles"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def profiling_requested():
+    """True when an admin asked for this request to be profiled."""
+    flag = request.headers.get("X-Profile") or request.args.get("_profile")
+    if not flag or flag.lower() in ("0", "false", "no"):
+        return False
+
+    return current_user.is_authenticated and current_user.is_admin
+
+
+def list_profiles(app):
+    """Stored profiles, newest first, as dicts of name, size and creation time."""
+    directory = profile_dir(app)
+    profiles = []
+
+    for name in os.listdir(directory):
+        if not name.endswith(".prof"):
+            continue
+        stat = os.stat(os.path.join(directory, name))
+        profiles.append(
+            {"name": name, "size": stat.st_size, "created_at": stat.st_mtime}
+        )
+
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def _prune(app):
+    keep = app.config["PROFILE_KEEP"]
+    for profile in list_profiles(app)[keep:]:
+        try:
+            os.remove(os.path.join(profile_dir(app), profile["name"]))
+        except OSError:
+            pass
+
+
+def init_profiling(app):
+    """
+    Let admins profile a single request on demand.
+
+    Send "X-Profile: 1" or add "?_profile=1" to run that request under
+    cProfile. The stats are written to PROFILE_DIR and the response carries
+    an X-Profile-Id header naming the file, which the admin blueprint serves.
+    """
+
+    @app.before_request
+    def start_profiler():
+        if not profiling_requested():
+            return
+
+        if not _profile_lock.acquire(blocking=False):
+            g.profile_busy = True
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) already owns the hooks
+            _profile_lock.release()
+            g.profile_busy = True
+            return
+
+        g.profiler = profiler
+
+    @app.after_request
+    def save_profile(response):
+        profiler = g.pop("profiler", None)
+
+        if profiler is not None:
+            try:
+                profiler.disable()
+                endpoint = (request.endpoint or "unmatched").replace(".", "-")
+                name = f"{int(time.time())}-{endpoint}-{uuid.uuid4().hex[:8]}.prof"
+                profiler.dump_stats(os.path.join(profile_dir(app), name))
+                _prune(app)
+                response.headers["X-Profile-Id"] = name
+                logger.info(f"Stored profile {name} for {request.method} {request.path}")
+            finally:
+                _profile_lock.release()
+        elif g.pop("profile_busy", False):
+            response.headers["X-Profile-Id"] = "busy"
+
+        return response
+
+    @app.teardown_request
+    def release_profiler(error=None):
+        # after_request doesn't run when a view raises; don't leak the lock
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
@@ -0,0 +1,178 @@
+import re
+import time
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import request, g, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from utils.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_TIME_PER_REQUEST,
+    SLOW_QUERIES,
+    REPEATED_QUERY_REQUESTS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Collectors opened with query_budget(), fed alongside the per-request stats
+_budgets = []
+_budgets_lock = threading.Lock()
+
+_settings = {"slow_query_ms": None}
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|%s|:\w+")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request or block ran more queries, or repeated a shape more often, than allowed."""
+
+
+def query_shape(statement):
+    """
+    Normalize a SQL statement so repeats of the same query compare equal.
+
+    Bound parameters, IN-lists and inline literals are replaced with "?",
+    so "WHERE id = ?" for user 1 and user 2 count as the same shape.
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    shape = _NAMED_PARAM.sub("?", shape)
+    return _LITERAL.sub("?", shape)
+
+
+class QueryStats:
+    """Query count, DB time and per-shape counts for one request or block."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def add(self, statement, elapsed):
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[query_shape(statement)] += 1
+
+    def repeated(self, limit):
+        """Shapes run more than limit times, most repeated first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n > limit]
+
+
+@contextmanager
+def query_budget(max_queries=None, max_repeats=None):
+    """
+    Count queries run inside the block and raise if it goes over budget.
+
+    Meant for tests and benchmarks, e.g.
+
+        with query_budget(max_repeats=2):
+            client.get("/admin/api/users")
+
+    Raises:
+        QueryBudgetExceeded: If more than max_queries statements ran, or any
+            query shape ran more than max_repeats times
+    """
+    stats = QueryStats()
+    with _budgets_lock:
+        _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        with _budgets_lock:
+            _budgets.remove(stats)
+
+    if max_queries is not None and stats.count > max_queries:
+        raise QueryBudgetExceeded(f"{stats.count} queries ran, budget was {max_queries}")
+
+    if max_repeats is not None:
+        repeated = stats.repeated(max_repeats)
+        if repeated:
+            shape, n = repeated[0]
+            raise QueryBudgetExceeded(
+                f"Query repeated {n} times (limit {max_repeats}): {shape[:300]}"
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+
+    with _budgets_lock:
+        for stats in _budgets:
+            stats.add(statement, elapsed)
+
+    endpoint = None
+    if has_request_context():
+        endpoint = request.endpoint or "unmatched"
+        stats = g.get("query_stats")
+        if stats is not None:
+            stats.add(statement, elapsed)
+        spans = g.setdefault("timing_spans", {})
+        spans["db"] = spans.get("db", 0.0) + elapsed
+
+    slow_ms = _settings["slow_query_ms"]
+    if slow_ms is not None and elapsed * 1000 >= slow_ms:
+        SLOW_QUERIES.labels(endpoint=endpoint or "none").inc()
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.0f}ms) in {endpoint or 'no request'}: "
+            f"{_WHITESPACE.sub(' ', statement)[:500]}"
+        )
+
+
+def init_query_stats(app):
+    """
+    Instrument every SQLAlchemy engine and record per-request query stats.
+
+    Each request gets its query count and DB time recorded in the metrics
+    histograms and a "db" Server-Timing span. Statements slower than
+    SLOW_QUERY_MS are logged with their endpoint. Requests that repeat one
+    query shape more than QUERY_REPEAT_LIMIT times are logged as likely N+1s,
+    and fail with QueryBudgetExceeded when QUERY_REPEAT_STRICT is set.
+    """
+    _settings["slow_query_ms"] = app.config.get("SLOW_QUERY_MS")
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def record_query_stats(response):
+        stats = g.pop("query_stats", None)
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or "unmatched"
+        DB_QUERIES_PER_REQUEST.labels(endpoint=endpoint).observe(stats.count)
+        DB_TIME_PER_REQUEST.labels(endpoint=endpoint).observe(stats.duration)
+
+        limit = app.config.get("QUERY_REPEAT_LIMIT")
+        repeated = stats.repeated(limit) if limit else []
+        if repeated:
+            REPEATED_QUERY_REQUESTS.labels(endpoint=endpoint).inc()
+            shape, n = repeated[0]
+            message = (
+                f"{endpoint} repeated a query {n} times (limit {limit}), "
+                f"likely N+1: {shape[:300]}"
+            )
+            if app.config.get("QUERY_REPEAT_STRICT"):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
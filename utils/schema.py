@@ -0,0 +1,90 @@
+"""
+In-place upgrades for databases created by an earlier version.
+
+db.create_all() creates missing tables but never alters existing ones, so
+columns and indexes added to existing tables are listed here and added by
+
+    flask --app app upgrade-schema
+
+Deploy order: run it against the production database before the new code
+starts serving (deploy.sh does this when DATABASE_URL is set). Every step is
+additive and skipped when already applied, so the old version keeps working
+on the upgraded schema and the command can be re-run safely. After the new
+version is live, `flask --app app backfill-user-counters` fills in the user
+usage counters, which start at zero on existing rows.
+"""
+import logging
+
+import click
+from sqlalchemy import inspect, text
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# (table, column) added to a table that existing databases already have;
+# the type, default and nullability come from the model
+ADDED_COLUMNS = (
+    ("generated_images", "overlay_spec"),
+    ("generated_images", "variants"),
+    ("users", "generation_count"),
+    ("users", "image_count"),
+    ("users", "last_generated_at"),
+)
+
+# (table, index name) of indexes over ADDED_COLUMNS, created after them
+ADDED_INDEXES = (
+    ("users", "idx_users_generation_count"),
+)
+
+
+def _add_column_ddl(table, column):
+    col = db.metadata.tables[table].c[column]
+    ddl = f"ALTER TABLE {table} ADD COLUMN {column} {col.type.compile(dialect=db.engine.dialect)}"
+    if col.server_default is not None:
+        ddl += f" DEFAULT {col.server_default.arg}"
+    if not col.nullable:
+        ddl += " NOT NULL"
+    return ddl
+
+
+def upgrade_schema():
+    """
+    Create missing tables, then add missing columns and their indexes.
+
+    Returns:
+        list: "table.column" for each column and the name of each index added
+    """
+    db.create_all()
+
+    inspector = inspect(db.engine)
+    added = []
+
+    with db.engine.begin() as conn:
+        for table, column in ADDED_COLUMNS:
+            existing = {info["name"] for info in inspector.get_columns(table)}
+            if column in existing:
+                continue
+            conn.execute(text(_add_column_ddl(table, column)))
+            added.append(f"{table}.{column}")
+            logger.info(f"Added column {table}.{column}")
+
+        for table, name in ADDED_INDEXES:
+            if name in {info["name"] for info in inspector.get_indexes(table)}:
+                continue
+            index = next(i for i in db.metadata.tables[table].indexes if i.name == name)
+            index.create(conn)
+            added.append(name)
+            logger.info(f"Created index {name}")
+
+    return added
+
+
+def init_schema(app):
+    """Register the upgrade-schema CLI command."""
+
+    @app.cli.command("upgrade-schema")
+    def upgrade_schema_command():
+        """Bring an existing database up to the current models."""
+        added = upgrade_schema()
+        click.echo(f"Schema up to date ({len(added)} changes: {', '.join(added) or 'none'})")
@@ -0,0 +1,122 @@
+import re
+import logging
+
+import click
+from sqlalchemy import DDL, and_, event, false, func, literal_column, select, text
+from sqlalchemy import table as sql_table
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# (table, id column, text column) pairs covered by full-text search
+SEARCHABLE = (
+    ("generations", "id", "title"),
+    ("feedback", "id", "message"),
+)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _sqlite_ddl(table, id_column, column):
+    """FTS5 external-content index over table.column, kept in sync by triggers."""
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{table}', content_rowid='{id_column}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.{id_column}, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.{id_column}, old.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.{id_column}, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.{id_column}, new.{column}); END",
+    ]
+
+
+def _postgres_ddl(table, id_column, column):
+    """GIN expression index; Postgres maintains it on every write."""
+    return [
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_fts ON {table} "
+        f"USING GIN (to_tsvector('english', {column}))",
+    ]
+
+
+def _ddl_for(table, id_column, column, dialect):
+    if dialect == "sqlite":
+        return _sqlite_ddl(table, id_column, column)
+    if dialect == "postgresql":
+        return _postgres_ddl(table, id_column, column)
+    return []
+
+
+# Create the index objects alongside their tables in db.create_all()
+for _table, _id_column, _column in SEARCHABLE:
+    for _dialect in ("sqlite", "postgresql"):
+        for _statement in _ddl_for(_table, _id_column, _column, _dialect):
+            event.listen(
+                db.metadata.tables[_table],
+                "after_create",
+                DDL(_statement).execute_if(dialect=_dialect),
+            )
+
+
+def search_terms(query):
+    """Words of a user-supplied search, with FTS operators stripped."""
+    return _WORD.findall(query or "")[:16]
+
+
+def matches(model, column, query):
+    """
+    SQLAlchemy criterion for rows of model whose column matches query.
+
+    Every word must match; on SQLite the last word also matches as a prefix,
+    so results narrow as the user types. Uses the FTS5 table on SQLite and the
+    GIN-indexed tsvector on Postgres, and falls back to ILIKE elsewhere.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return false()
+
+    dialect = db.engine.dialect.name
+
+    if dialect == "sqlite":
+        fts = f"{model.__table__.name}_fts"
+        expression = " ".join([*(f'"{term}"' for term in terms[:-1]), f'"{terms[-1]}"*'])
+        return model.id.in_(
+            select(literal_column("rowid"))
+            .select_from(sql_table(fts))
+            .where(text(f"{fts} MATCH :expression").bindparams(expression=expression))
+        )
+
+    if dialect == "postgresql":
+        return func.to_tsvector("english", column).op("@@")(
+            func.plainto_tsquery("english", " ".join(terms))
+        )
+
+    return and_(*(column.ilike(f"%{term}%") for term in terms))
+
+
+def rebuild_search_index():
+    """Create missing index objects and re-index existing rows."""
+    dialect = db.engine.dialect.name
+
+    with db.engine.begin() as conn:
+        for table, id_column, column in SEARCHABLE:
+            for statement in _ddl_for(table, id_column, column, dialect):
+                conn.execute(text(statement))
+            if dialect == "sqlite":
+                conn.execute(text(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"))
+
+    return dialect
+
+
+def init_search(app):
+    """Register the search-reindex CLI command."""
+
+    @app.cli.command("search-reindex")
+    def search_reindex():
+        """Build full-text indexes for an existing database."""
+        dialect = rebuild_search_index()
+        click.echo(f"Search index rebuilt ({dialect})")
+
@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.metrics import SPECULATIVE_GENERATIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _threads_are_greenlets():
+    """True in a gevent worker, where executor "threads" are greenlets on one OS thread."""
+    gevent_monkey = sys.modules.get("gevent.monkey")
+    return gevent_monkey is not None and gevent_monkey.is_module_patched("threading")
+
+
+def _lower_priority():
+    """
+    Renice the calling worker thread so speculative rendering yields the CPU to real requests.
+
+    Skipped under gevent: the native thread ID there is the whole worker's,
+    and renicing it would slow every request the worker serves.
+    """
+    if _threads_are_greenlets():
+        return
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class Speculation:
+    def __init__(self, key, ttl):
+        self.key = key
+        self.generation_id = str(uuid.uuid4())
+        self.expires = time.monotonic() + ttl
+        self.future = None
+
+
+class SpeculativeGenerator:
+    """
+    Generates covers ahead of time from the app page's prefetch hints.
+
+    Each owner (user, or anonymous session) holds at most one speculation;
+    a new hint for different input replaces a finished one and is refused
+    while one is still running. At most `workers` speculations run at once
+    across the process, on their own low-priority threads, so hints can
+    never take capacity from real /api/generate requests.
+
+    Results go into the pending image store under their own generation ID.
+    /api/generate adopts the owner's speculation when the title, style and
+    draft link match, waiting for it if it is still running; anything not
+    adopted within ttl seconds is dropped from the store.
+    """
+
+    def __init__(self, store, workers=1, ttl=300):
+        self.store = store
+        self.workers = workers
+        self.ttl = ttl
+        self._entries = {}
+        self._running = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self, owner, generate, title, style, draft_link=None):
+        """
+        Start speculating for owner unless capped.
+
+        generate(title, style, draft_link) must return a list of image bytes.
+
+        Returns:
+            str: "started", "pending" (same input already running), "ready"
+                (same input already finished) or "busy" (capped, not started)
+        """
+        key = (title, style, draft_link)
+
+        with self._lock:
+            self._sweep()
+            current = self._entries.get(owner)
+
+            if current is not None and current.key == key:
+                return "ready" if current.future.done() else "pending"
+            if current is not None and not current.future.done():
+                SPECULATIVE_GENERATIONS.labels(result="rejected").inc()
+                return "busy"
+            if self._running >= self.workers:
+                SPECULATIVE_GENERATIONS.labels(result="rejected").inc()
+                return "busy"
+
+            if current is not None:
+                self._discard(current)
+
+            speculation = Speculation(key, self.ttl)
+            self._running += 1
+            speculation.future = self._get_executor().submit(self._run, speculation, generate)
+            self._entries[owner] = speculation
+
+        SPECULATIVE_GENERATIONS.labels(result="started").inc()
+        return "started"
+
+    def adopt(self, owner, title, style, draft_link=None, timeout=None):
+        """
+        Claim owner's speculation for this input, waiting up to timeout
+        seconds if it is still running.
+
+        Returns:
+            str: Generation ID of the images in the pending store, or None if
+                there is no matching speculation or it failed
+        """
+        with self._lock:
+            speculation = self._entries.get(owner)
+            if speculation is None or speculation.key != (title, style, draft_link):
+                return None
+            del self._entries[owner]
+
+        try:
+            speculation.future.result(timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Speculative generation not adopted: {e}")
+            self._discard(speculation)
+            return None
+
+        if speculation.generation_id not in self.store:
+            return None
+
+        SPECULATIVE_GENERATIONS.labels(result="adopted").inc()
+        return speculation.generation_id
+
+    def _run(self, speculation, generate):
+        try:
+            images = generate(*speculation.key)
+            if images:
+                self.store[speculation.generation_id] = list(images)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _discard(self, speculation):
+        """Drop an unadopted speculation's images, now or when it finishes."""
+        SPECULATIVE_GENERATIONS.labels(result="wasted").inc()
+
+        def drop(future):
+            del self.store[speculation.generation_id]
+
+        speculation.future.add_done_callback(drop)
+
+    def _sweep(self):
+        now = time.monotonic()
+        for owner, speculation in list(self._entries.items()):
+            if speculation.expires <= now and speculation.future.done():
+                del self._entries[owner]
+                self._discard(speculation)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="cover-speculative",
+                initializer=_lower_priority,
+            )
+        return self._executor
@@ -1,7 +1,20 @@
 import os
-from google.cloud import storage
+import re
+import hashlib
+import logging
 from datetime import timedelta
 
+from utils.metrics import track_stage
+
+logger = logging.getLogger(__name__)
+
+# Content-addressed objects are never rewritten, so clients may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_CONTENT_PATH = re.compile(r"^objects/[0-9a-f]{2}/([0-9a-f]{64})\.(png|webp|jpg)$")
+
+CONTENT_TYPES = {"png": "image/png", "webp": "image/webp", "jpg": "image/jpeg"}
+
 
 class GCSStorage:
     """Handle image uploads to Google Cloud Storage."""
@@ -13,6 +26,9 @@ class GCSStorage:
         if not self.bucket_name:
             raise ValueError("GCS_BUCKET_NAME environment variable is required")
 
+        # Imported here so the SDK only loads when storage is first used
+        from google.cloud import storage
+
         self.client = storage.Client(project=self.project_id)
         self.bucket = self.client.bucket(self.bucket_name)
 
@@ -22,25 +38,124 @@ class GCSStorage:
         blob_path = f"{folder}/{filename}"
 
         blob = self.bucket.blob(blob_path)
-        blob.upload_from_string(image_bytes, content_type="image/png")
-        blob.cache_control = "public, max-age=3600"
-        blob.patch()
+        with track_stage("storage_upload"):
+            blob.upload_from_string(image_bytes, content_type="image/png")
+            blob.cache_control = "public, max-age=3600"
+            blob.patch()
 
         return blob_path
 
+    @staticmethod
+    def content_digest(image_bytes):
+        """SHA-256 hex digest identifying image_bytes in storage."""
+        return hashlib.sha256(image_bytes).hexdigest()
+
+    @staticmethod
+    def content_path(digest, ext="png"):
+        """Storage path for the object with the given digest."""
+        return f"objects/{digest[:2]}/{digest}.{ext}"
+
+    @staticmethod
+    def digest_from_path(storage_path):
+        """Digest for a content-addressed path, or None for legacy per-user paths."""
+        match = _CONTENT_PATH.match(storage_path or "")
+        return match.group(1) if match else None
+
+    @staticmethod
+    def content_type(storage_path):
+        """MIME type for a storage path, from its extension."""
+        ext = storage_path.rsplit(".", 1)[-1].lower()
+        return CONTENT_TYPES.get(ext, "image/png")
+
+    def upload_content(self, image_bytes, digest=None, ext="png"):
+        """
+        Store image bytes under their content digest and return the path.
+
+        The upload is create-only: if an object with the same digest already
+        exists, GCS rejects the write and the existing object is kept.
+        """
+        from google.api_core.exceptions import PreconditionFailed
+
+        digest = digest or self.content_digest(image_bytes)
+        blob = self.bucket.blob(self.content_path(digest, ext))
+        blob.cache_control = IMMUTABLE_CACHE_CONTROL
+
+        with track_stage("storage_upload"):
+            try:
+                blob.upload_from_string(
+                    image_bytes, content_type=CONTENT_TYPES[ext], if_generation_match=0
+                )
+            except PreconditionFailed:
+                pass
+
+        return blob.name
+
     def delete_image(self, storage_path):
         """Delete an image from GCS using its storage path."""
         blob = self.bucket.blob(storage_path)
-        blob.delete()
+        with track_stage("storage_delete"):
+            blob.delete()
 
     def download_image(self, storage_path):
         """Download image bytes from GCS using storage path."""
         blob = self.bucket.blob(storage_path)
 
-        if not blob.exists():
-            return None
+        with track_stage("storage_download"):
+            if not blob.exists():
+                return None
+
+            return blob.download_as_bytes()
+
+    def stream_image(self, storage_path, chunk_size=1024 * 1024):
+        """
+        Open a stored image for streaming.
+
+        The object is opened and its first chunk read here, so call this from
+        the view: a missing object or failed read surfaces before any of the
+        response is sent. A failure later in the stream is logged and the
+        reader closed from inside the iterator.
+
+        Returns:
+            tuple or None: (iterator of byte chunks, size in bytes), or None
+                if the object doesn't exist. Only one chunk is held in memory
+                at a time.
+        """
+        from google.api_core.exceptions import NotFound
+
+        blob = self.bucket.blob(storage_path)
+        with track_stage("storage_download"):
+            try:
+                blob.reload()
+                reader = blob.open("rb", chunk_size=chunk_size)
+            except NotFound:
+                return None
+            try:
+                first = reader.read(chunk_size)
+            except NotFound:
+                reader.close()
+                return None
+            except Exception:
+                reader.close()
+                raise
+
+        def chunks():
+            sent = 0
+            try:
+                with track_stage("storage_stream"):
+                    chunk = first
+                    while chunk:
+                        yield chunk
+                        sent += len(chunk)
+                        chunk = reader.read(chunk_size)
+            except Exception as e:
+                logger.error(
+                    f"Streaming {storage_path} failed after {sent} of {blob.size} bytes: {e}"
+                )
+                raise
+            finally:
+                reader.close()
 
-        return blob.download_as_bytes()
+        return chunks(), blob.size
 
     def delete_user_folder(self, username):
         """Delete all images for a specific user."""
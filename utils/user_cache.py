@@ -0,0 +1,76 @@
+import time
+import threading
+from collections import OrderedDict
+
+from flask_login import UserMixin
+
+from config import Config
+
+
+class CachedUser(UserMixin):
+    """
+    Identity data for a logged-in user, detached from the database session.
+
+    Flask-Login's current_user is one of these on requests after login, so
+    it carries only what request handling reads: id, username and is_admin.
+    Load the User row explicitly when more is needed.
+    """
+
+    def __init__(self, id, username, is_admin):
+        self.id = id
+        self.username = username
+        self.is_admin = is_admin
+
+    def __repr__(self):
+        return f"<CachedUser {self.id} {self.username}>"
+
+
+class UserCache:
+    """
+    Per-process TTL cache of user identities for the Flask-Login user_loader.
+
+    Changes made through the app (promote, demote, delete, logout) invalidate
+    the entry explicitly; the TTL bounds how long other worker processes can
+    serve a stale role after such a change. At most max_entries users are
+    kept; the least recently used is evicted first.
+    """
+
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, load):
+        """
+        Return the CachedUser for user_id, calling load(user_id) on a miss.
+
+        load returns a CachedUser or None; a None result is not cached, so
+        a missing user is looked up again on the next request.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                return entry[0]
+
+        user = load(user_id)
+        if user is not None:
+            with self._lock:
+                self._entries[user_id] = (user, now + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id=None):
+        """Drop one user's entry, or every entry if user_id is None."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+user_cache = UserCache(ttl=Config.USER_CACHE_TTL, max_entries=Config.USER_CACHE_ENTRIES)